@@ -1,11 +1,33 @@
 from ChromaDB.client import get_chroma_client
+from cachetools import TTLCache
 import random
+import threading
 from typing import Dict, List, Optional, Set
 
 # Global variables for lazy initialization
 _client = None
 _collection = None
 
+# Raw Chroma query results, LRU with a TTL. Optimize requests repeat the same
+# few templated queries, so most searches skip the embedding and the ANN
+# lookup; diversity filtering still runs on every request.
+QUERY_CACHE_SIZE = 512
+# Bounds how long writes made by other processes stay invisible
+QUERY_CACHE_TTL = 300.0
+
+_query_cache = TTLCache(maxsize=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL)
+_query_cache_lock = threading.Lock()
+# Bumped by every write through this process; part of each cache key, so
+# results from an older collection are never served
+_collection_version = 0
+
+def bump_collection_version():
+    """Mark the collection as changed, dropping every cached query result."""
+    global _collection_version
+    with _query_cache_lock:
+        _collection_version += 1
+        _query_cache.clear()
+
 def get_client():
     """Get ChromaDB client with lazy initialization."""
     global _client
@@ -48,6 +70,27 @@ def add_component(doc: str, metadata: dict, id: str):
         metadatas=[metadata],
         ids=[id]
     )
+    bump_collection_version()
+
+def _query_collection(collection, query: str, n_results: int, where: Optional[dict]) -> Dict:
+    """collection.query for one text, served from the cache when possible."""
+    key = (_collection_version, query, repr(where), n_results)
+    with _query_cache_lock:
+        cached = _query_cache.get(key)
+    if cached is not None:
+        return cached
+
+    search_args = {"query_texts": [query], "n_results": n_results}
+    if where:
+        search_args["where"] = where
+    results = collection.query(**search_args)
+
+    with _query_cache_lock:
+        # A write that landed during the query changed the version; the
+        # result is keyed under the old one and can never be read again
+        if key[0] == _collection_version:
+            _query_cache[key] = results
+    return results
 
 def search_components(
     query: str, 
@@ -94,17 +137,9 @@ def search_components(
     # Get more results than needed for diversity filtering
     search_multiplier = max(3, int(n_results * (1 + diversity_factor * 5)))
     
-    # Perform the search
-    search_args = {
-        "query_texts": [query],
-        "n_results": min(search_multiplier, 50)  # Cap at 50 to avoid too large results
-    }
-    
-    if where_clause:
-        search_args["where"] = where_clause
-    
+    # Perform the search. Cap at 50 to avoid too large results
     try:
-        results = collection.query(**search_args)
+        results = _query_collection(collection, query, min(search_multiplier, 50), where_clause)
     except Exception as e:
         print(f"Warning: ChromaDB search failed: {e}")
         return {"ids": [[]], "distances": [[]], "documents": [[]], "metadatas": [[]]}
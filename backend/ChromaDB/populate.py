@@ -1,5 +1,6 @@
 import json
 from ChromaDB.client import get_chroma_client
+from ChromaDB.manager import bump_collection_version
 import os
 
 def clean_metadata(metadata):
@@ -57,6 +58,8 @@ def populate_chroma():
                 metadatas=[cleaned_metadata],
                 ids=[component['id']]
             )
+        # Searches that ran while the collection was empty were cached
+        bump_collection_version()
         
         print(f"Successfully populated ChromaDB with {len(data['chroma_components'])} components")
         
@@ -0,0 +1,40 @@
+"""add published builds rating sum
+
+Revision ID: 00ff9d947da2
+Revises: 05bdf58d376b
+Create Date: 2026-10-17 18:06:41.583920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '00ff9d947da2'
+down_revision: Union[str, None] = '05bdf58d376b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('published_builds', sa.Column('rating_sum', sa.Float(), server_default='0', nullable=False))
+
+    # Rebuild all three aggregates from the ratings themselves; the old
+    # read-modify-write path could have lost concurrent votes
+    op.execute(
+        'UPDATE published_builds SET '
+        'rating_sum = COALESCE((SELECT SUM(rating) FROM build_ratings '
+        'WHERE build_ratings.published_build_id = published_builds.id), 0), '
+        'rating_count = (SELECT COUNT(*) FROM build_ratings '
+        'WHERE build_ratings.published_build_id = published_builds.id)'
+    )
+    op.execute(
+        'UPDATE published_builds SET avg_rating = CASE WHEN rating_count > 0 '
+        'THEN rating_sum / rating_count ELSE 0 END'
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('published_builds', 'rating_sum')
@@ -0,0 +1,49 @@
+"""add build gallery sort indexes
+
+Revision ID: 05bdf58d376b
+Revises: a4a98da5c20f
+Create Date: 2026-10-17 17:34:50.218736
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '05bdf58d376b'
+down_revision: Union[str, None] = 'a4a98da5c20f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns); one (sort column, id) pair per gallery sort
+SORT_INDEXES = [
+    ('ix_published_builds_created_at_id', 'published_builds', ['created_at', 'id']),
+    ('ix_published_builds_avg_rating_id', 'published_builds', ['avg_rating', 'id']),
+    ('ix_published_builds_rating_count_id', 'published_builds', ['rating_count', 'id']),
+    ('ix_saved_builds_total_price_id', 'saved_builds', ['total_price', 'id']),
+]
+
+# Single-column indexes the composites above make redundant
+REPLACED_INDEXES = [
+    ('ix_published_builds_created_at', 'published_builds', ['created_at']),
+    ('ix_saved_builds_total_price', 'saved_builds', ['total_price']),
+]
+
+
+def upgrade() -> None:
+    # Built CONCURRENTLY like the other gallery indexes, outside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in SORT_INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+        for name, table, _ in REPLACED_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in REPLACED_INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+        for name, table, _ in reversed(SORT_INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
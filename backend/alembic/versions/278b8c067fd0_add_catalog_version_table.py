@@ -0,0 +1,32 @@
+"""add catalog version table
+
+Revision ID: 278b8c067fd0
+Revises: 4231e907689d
+Create Date: 2026-10-17 10:03:12.881904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '278b8c067fd0'
+down_revision: Union[str, None] = '4231e907689d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    catalog_version = op.create_table('catalog_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(catalog_version, [{'id': 1, 'version': 1}])
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_version')
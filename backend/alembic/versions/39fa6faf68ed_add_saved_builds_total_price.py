@@ -0,0 +1,47 @@
+"""add saved builds total price
+
+Revision ID: 39fa6faf68ed
+Revises: 3e773743815e
+Create Date: 2026-10-17 16:21:37.408152
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '39fa6faf68ed'
+down_revision: Union[str, None] = '3e773743815e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# saved_builds foreign key -> component table
+PRICE_COLUMNS = {
+    'cpu_id': 'cpus',
+    'gpu_id': 'gpus',
+    'motherboard_id': 'motherboards',
+    'ram_id': 'ram',
+    'psu_id': 'psus',
+    'case_id': 'chassis',
+    'storage_id': 'storage_devices',
+    'cooler_id': 'cpu_coolers',
+}
+
+
+def upgrade() -> None:
+    op.add_column('saved_builds', sa.Column('total_price', sa.Float(), nullable=True))
+
+    total = ' + '.join(
+        f'COALESCE((SELECT price FROM {table} WHERE {table}.id = saved_builds.{column}), 0)'
+        for column, table in PRICE_COLUMNS.items()
+    )
+    op.execute(f'UPDATE saved_builds SET total_price = {total}')
+
+    op.create_index(op.f('ix_saved_builds_total_price'), 'saved_builds', ['total_price'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_saved_builds_total_price'), table_name='saved_builds')
+    op.drop_column('saved_builds', 'total_price')
@@ -0,0 +1,32 @@
+"""add catalog sort indexes
+
+Revision ID: 4231e907689d
+Revises: 0cd463f17bf1
+Create Date: 2026-10-17 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4231e907689d'
+down_revision: Union[str, None] = '0cd463f17bf1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CATALOG_TABLES = ['cpus', 'gpus', 'motherboards', 'ram', 'storage_devices', 'psus', 'cpu_coolers', 'chassis']
+
+
+def upgrade() -> None:
+    for table in CATALOG_TABLES:
+        op.create_index(f'ix_{table}_price_id', table, ['price', 'id'], unique=False)
+        op.create_index(f'ix_{table}_name_id', table, ['name', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    for table in CATALOG_TABLES:
+        op.drop_index(f'ix_{table}_name_id', table_name=table)
+        op.drop_index(f'ix_{table}_price_id', table_name=table)
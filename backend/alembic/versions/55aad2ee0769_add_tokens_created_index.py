@@ -0,0 +1,34 @@
+"""add tokens created index
+
+Revision ID: 55aad2ee0769
+Revises: a6673bc548da
+Create Date: 2026-10-17 15:02:36.918402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '55aad2ee0769'
+down_revision: Union[str, None] = 'a6673bc548da'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # tokens takes a write on every login, so build CONCURRENTLY (outside a
+    # transaction) rather than holding a SHARE lock for the whole build. A
+    # build that fails leaves an INVALID index behind; drop it before rerunning.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tokens_created', 'tokens', ['created'],
+            unique=False, if_not_exists=True, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_tokens_created', table_name='tokens', if_exists=True, postgresql_concurrently=True)
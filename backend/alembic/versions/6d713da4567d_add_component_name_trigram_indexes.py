@@ -0,0 +1,42 @@
+"""add component name trigram indexes
+
+Revision ID: 6d713da4567d
+Revises: 278b8c067fd0
+Create Date: 2026-10-17 11:26:05.114372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d713da4567d'
+down_revision: Union[str, None] = '278b8c067fd0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CATALOG_TABLES = ['cpus', 'gpus', 'motherboards', 'ram', 'storage_devices', 'psus', 'cpu_coolers', 'chassis']
+
+
+def upgrade() -> None:
+    # pg_trgm only exists on Postgres; other backends use the in-memory index
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table in CATALOG_TABLES:
+        # Must match the lower(name) expression used by core.search
+        op.execute(
+            f'CREATE INDEX IF NOT EXISTS ix_{table}_name_trgm '
+            f'ON {table} USING gin (lower(name) gin_trgm_ops)'
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in CATALOG_TABLES:
+        op.execute(f'DROP INDEX IF EXISTS ix_{table}_name_trgm')
@@ -0,0 +1,65 @@
+"""add saved builds search document
+
+Revision ID: 7c1e5b9d42a3
+Revises: 00ff9d947da2
+Create Date: 2026-10-17 19:12:08.356214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e5b9d42a3'
+down_revision: Union[str, None] = '00ff9d947da2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# saved_builds foreign key -> component table
+COMPONENT_COLUMNS = {
+    'cpu_id': 'cpus',
+    'gpu_id': 'gpus',
+    'motherboard_id': 'motherboards',
+    'ram_id': 'ram',
+    'psu_id': 'psus',
+    'case_id': 'chassis',
+    'storage_id': 'storage_devices',
+    'cooler_id': 'cpu_coolers',
+}
+
+# Must match search_vector() in core.build_search
+SEARCH_VECTOR = (
+    "to_tsvector('swedish'::regconfig, search_document) || "
+    "to_tsvector('english'::regconfig, search_document)"
+)
+
+
+def upgrade() -> None:
+    op.add_column('saved_builds', sa.Column('search_document', sa.Text(), server_default='', nullable=False))
+
+    parts = ["COALESCE(name, '')", "COALESCE(purpose, '')"] + [
+        f"COALESCE((SELECT name FROM {table} WHERE {table}.id = saved_builds.{column}), '')"
+        for column, table in COMPONENT_COLUMNS.items()
+    ]
+    document = " || ' ' || ".join(parts)
+    op.execute(f'UPDATE saved_builds SET search_document = {document}')
+
+    # Full-text search only exists on Postgres; other backends use the in-memory index
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_saved_builds_search_document '
+            f'ON saved_builds USING gin (({SEARCH_VECTOR}))'
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_saved_builds_search_document')
+
+    op.drop_column('saved_builds', 'search_document')
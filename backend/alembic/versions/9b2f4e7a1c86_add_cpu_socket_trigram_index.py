@@ -0,0 +1,39 @@
+"""add cpu socket trigram index
+
+Revision ID: 9b2f4e7a1c86
+Revises: 7c1e5b9d42a3
+Create Date: 2026-10-17 21:04:51.227190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2f4e7a1c86'
+down_revision: Union[str, None] = '7c1e5b9d42a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # pg_trgm only exists on Postgres; other backends use the in-memory index
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # Must match the lower(socket) expression used by core.search
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cpus_socket_trgm '
+            'ON cpus USING gin (lower(socket) gin_trgm_ops)'
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_cpus_socket_trgm')
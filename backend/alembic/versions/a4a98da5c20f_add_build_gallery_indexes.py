@@ -0,0 +1,50 @@
+"""add build gallery indexes
+
+Revision ID: a4a98da5c20f
+Revises: 39fa6faf68ed
+Create Date: 2026-10-17 16:58:12.730419
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4a98da5c20f'
+down_revision: Union[str, None] = '39fa6faf68ed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_saved_builds_purpose', 'saved_builds', ['purpose']),
+    ('ix_saved_builds_user_id', 'saved_builds', ['user_id']),
+    ('ix_saved_builds_cpu_id', 'saved_builds', ['cpu_id']),
+    ('ix_saved_builds_gpu_id', 'saved_builds', ['gpu_id']),
+    ('ix_saved_builds_motherboard_id', 'saved_builds', ['motherboard_id']),
+    ('ix_saved_builds_ram_id', 'saved_builds', ['ram_id']),
+    ('ix_saved_builds_psu_id', 'saved_builds', ['psu_id']),
+    ('ix_saved_builds_case_id', 'saved_builds', ['case_id']),
+    ('ix_saved_builds_storage_id', 'saved_builds', ['storage_id']),
+    ('ix_saved_builds_cooler_id', 'saved_builds', ['cooler_id']),
+    ('ix_published_builds_build_id', 'published_builds', ['build_id']),
+    ('ix_published_builds_created_at', 'published_builds', ['created_at']),
+    ('ix_build_ratings_published_build_id_created_at', 'build_ratings', ['published_build_id', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY builds without locking out writes on Postgres, but cannot
+    # run inside a transaction. A build that fails leaves an INVALID index
+    # behind; drop it before rerunning, IF NOT EXISTS would skip it.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -1,41 +1,56 @@
-from datetime import UTC, datetime, timedelta
+from datetime import UTC, datetime
 from fastapi import APIRouter, HTTPException, Depends, status, Request
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from core.security import get_password_hash, verify_password, validate_password_strength
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.security import get_password_hash_async, verify_password_async, validate_password_strength, PasswordPoolBusy
 from schemas import UserRegisterSchema, UserOutSchema
 from database import get_db
 from models import User, Token
-from core import settings
+from core.auth_cache import auth_cache, resolve_token
+from core.tokens import is_signed_token, create_signed_token, verify_signed_token, revocations
+from core.settings import settings
 import base64
 from random import SystemRandom
 from pydantic import BaseModel
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from core.rate_limit import limiter
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 _sysrand = SystemRandom()
-limiter = Limiter(key_func=get_remote_address)
 
 def token_urlsafe(nbytes=32):
     tok = _sysrand.randbytes(nbytes)
     return base64.urlsafe_b64encode(tok).rstrip(b"=").decode("ascii")
 
-def create_database_token(user_id: int, db: Session):
+async def create_database_token(user_id: int, db: AsyncSession):
     randomized_token = token_urlsafe()
     new_token = Token(token=randomized_token, user_id=user_id)
     db.add(new_token)
-    db.commit()
+    await db.commit()
     return new_token
 
+async def issue_token(user_id: int, db: AsyncSession) -> str:
+    """Signed token when SIGNED_TOKENS is on, otherwise a database token"""
+    if settings.SIGNED_TOKENS:
+        token, _ = create_signed_token(user_id)
+        return token
+    return (await create_database_token(user_id, db)).token
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servern är överbelastad, försök igen om en stund",
+        headers={"Retry-After": "1"}
+    )
+
 class LoginData(BaseModel):
     email: str
     password: str
 
 @router.post("/register", response_model=UserOutSchema)
 @limiter.limit("5/minute")  # Limit registration attempts
-async def register_user(request: Request, user: UserRegisterSchema, db: Session = Depends(get_db)):
+async def register_user(request: Request, user: UserRegisterSchema, db: AsyncSession = Depends(get_db)):
     try:
         # Validate password strength
         password_validation = validate_password_strength(user.password)
@@ -45,7 +60,7 @@ async def register_user(request: Request, user: UserRegisterSchema, db: Session
                 detail=f"Lösenord uppfyller inte kraven: {', '.join(password_validation['errors'])}"
             )
       
-        existing_user = db.query(User).filter(User.email == user.email).first()
+        existing_user = await db.scalar(select(User).where(User.email == user.email))
         if existing_user:
             raise HTTPException(
                 status_code=400, 
@@ -55,18 +70,22 @@ async def register_user(request: Request, user: UserRegisterSchema, db: Session
         
         db_user = User(
             email=user.email,
-            hashed_password=get_password_hash(user.password),  
+            hashed_password=await get_password_hash_async(user.password),  
             created_at=datetime.utcnow()
         )
         
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await db.commit()
+        await db.refresh(db_user)
         
         return db_user
         
+    except HTTPException:
+        raise
+    except PasswordPoolBusy:
+        raise _busy()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500, 
             detail=f"Ett fel uppstod vid registrering: {str(e)}"
@@ -74,10 +93,10 @@ async def register_user(request: Request, user: UserRegisterSchema, db: Session
 
 @router.post("/login")
 @limiter.limit("10/minute")  # Limit login attempts
-async def login(request: Request, login_data: LoginData, db: Session = Depends(get_db)):
+async def login(request: Request, login_data: LoginData, db: AsyncSession = Depends(get_db)):
     try:
         # Find user
-        user = db.query(User).filter(User.email == login_data.email).first()
+        user = await db.scalar(select(User).where(User.email == login_data.email))
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -85,17 +104,17 @@ async def login(request: Request, login_data: LoginData, db: Session = Depends(g
             )
         
         # Verify password
-        if not verify_password(login_data.password, user.hashed_password):
+        if not await verify_password_async(login_data.password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Felaktig email eller lösenord"
             )
         
         # Create token
-        token = create_database_token(user.id, db)
+        token = await issue_token(user.id, db)
         
         return {
-            "access_token": token.token,
+            "access_token": token,
             "token_type": "bearer",
             "user": {
                 "id": user.id,
@@ -103,31 +122,34 @@ async def login(request: Request, login_data: LoginData, db: Session = Depends(g
             }
         }
         
+    except HTTPException:
+        raise
+    except PasswordPoolBusy:
+        raise _busy()
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Ett fel uppstod vid inloggning: {str(e)}"
         )
 
+async def _valid_token_user(db: AsyncSession, token: str):
+    user = await resolve_token(db, token)
+    if not user or user.token_expired() or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token invalid or expired",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return user
+
 @router.get("/me", response_model=UserOutSchema)
-async def read_users_me(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def read_users_me(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     try:
         # Verify token
-        max_age = timedelta(minutes=int(settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-        db_token = db.query(Token).filter(
-            Token.token == token,
-            Token.created >= datetime.now(UTC) - max_age
-        ).first()
-        
-        if not db_token:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token invalid or expired",
-                headers={"WWW-Authenticate": "Bearer"}
-            )
-        
-        return db_token.user
+        return await _valid_token_user(db, token)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -135,38 +157,59 @@ async def read_users_me(token: str = Depends(oauth2_scheme), db: Session = Depen
         )
 
 @router.post("/refresh-token")
-async def refresh_token(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def refresh_token(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     try:
         # Find the existing token
-        max_age = timedelta(minutes=int(settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-        db_token = db.query(Token).filter(
-            Token.token == token,
-            Token.created >= datetime.now(UTC) - max_age
-        ).first()
-        
-        if not db_token:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token invalid or expired",
-                headers={"WWW-Authenticate": "Bearer"}
+        user = await _valid_token_user(db, token)
+        
+        if is_signed_token(token):
+            # Signed tokens cannot be extended; swap it for a fresh one
+            new_token, _ = create_signed_token(user.id)
+            await revocations.revoke(db, verify_signed_token(token))
+        else:
+            # Update token timestamp
+            await db.execute(
+                update(Token).where(Token.token == token).values(created=datetime.now(UTC).replace(tzinfo=None))
             )
-        
-        # Update token timestamp
-        db_token.created = datetime.now(UTC)
-        db.commit()
-        db.refresh(db_token)
+            await db.commit()
+            new_token = token
+        auth_cache.invalidate_token(token)
         
         return {
-            "access_token": db_token.token,
+            "access_token": new_token,
             "token_type": "bearer",
             "user": {
-                "id": db_token.user.id,
-                "email": db_token.user.email
+                "id": user.id,
+                "email": user.email
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+
+@router.post("/logout")
+async def logout(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+    try:
+        if is_signed_token(token):
+            claims = verify_signed_token(token)
+            if claims:
+                await revocations.revoke(db, claims)
+        else:
+            await db.execute(delete(Token).where(Token.token == token))
+            await db.commit()
+        auth_cache.invalidate_token(token)
+        
+        return {"message": "Utloggad"}
+        
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
@@ -1,91 +1,251 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_, func
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from database import get_db
-from models import CPU, GPU, Motherboard, RAM, Storage, PSU, Cooler, Case, SavedBuild, Token, User, PublishedBuild, BuildRating
-from schemas import CPUModel, GPUModel, MotherboardModel, RAMModel, StorageModel, PSUModel, CoolerModel, CaseModel, SavedBuildCreate, SavedBuildOut, PublicBuildResponse, BuildRatingCreate, BuildRatingOut, PublishedBuildOut
-from .auth import oauth2_scheme
-from typing import Optional, List
-from fastapi.security import OAuth2PasswordBearer
-from fastapi.responses import JSONResponse
-from functools import lru_cache
-import time
+from models import SavedBuild, PublishedBuild, BuildRating
+from schemas import CPUModel, GPUModel, MotherboardModel, RAMModel, StorageModel, PSUModel, CoolerModel, CaseModel, SavedBuildCreate, SavedBuildOut, SavedBuildBatchCreate, BuildIdBatch, BatchResult, PublicBuildResponse, LeaderboardResponse, BuildRatingCreate, BuildRatingOut, PublishedBuildOut
+from core.catalog import CATALOG_MODELS, CATALOG_SCHEMAS, DEFAULT_PAGE_SIZES, TYPED_ID_PREFIXES, CatalogParams, query_components
+from core.catalog_cache import catalog_cache, etag_matches, cache_headers
+from core.search import search_components
+from core.compat import compatible_ids
+from core.facets import FACET_FIELDS, get_facet_index
+from core.serialization import BUILD_COMPONENTS, rows_to_dicts, saved_build_dict, published_build_dict, rating_dict, orjson_response
+from core.deps import get_current_user
+from core.gallery import GalleryParams, query_published_builds
+from core.ratings import apply_rating
+from core.leaderboard import LEADERBOARD_SIZE, Board, leaderboard
+from core.build_cache import published_build_cache
+from core import build_prices  # keeps SavedBuild.total_price current on every flush
+from core.auth_cache import AuthenticatedUser
+from typing import Optional, List, Literal
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-# Cache for component queries (5 minutes)
-@lru_cache(maxsize=100)
-def get_cached_components(component_type: str, limit: int = 50):
-    """Cache component queries to reduce database load"""
-    # This is a placeholder - in production you'd want Redis or similar
-    return None
+# Everything the build serializers read, loaded with one SELECT ... IN per
+# relationship for the whole page instead of one lazy load per row
+_BUILD_LOADERS = tuple(selectinload(getattr(SavedBuild, name)) for name in BUILD_COMPONENTS)
+_PUBLISHED_LOADERS = (
+    selectinload(PublishedBuild.build).options(*_BUILD_LOADERS),
+    selectinload(PublishedBuild.ratings),
+)
+
+
+def _list_catalog(
+    db: Session,
+    component_type: str,
+    params: CatalogParams,
+    if_none_match: Optional[str]
+):
+    """
+    Serve a catalog list, answering from the version-keyed snapshot cache
+    whenever possible. Every response carries an ETag tied to the catalog
+    version so unchanged lists cost the client a 304.
+
+    The catalog layer is written against the sync Session API; endpoints run
+    it on their AsyncSession through run_sync, which still does its I/O on
+    the async driver.
+    """
+    etag = catalog_cache.etag(db, component_type)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+
+    # Lists that have always been paged stay paged when no limit is given
+    if params.limit is None and component_type in DEFAULT_PAGE_SIZES:
+        params.limit = DEFAULT_PAGE_SIZES[component_type]
+
+    if params.is_default():
+        snapshot = catalog_cache.snapshot(db, component_type)
+        return Response(
+            content=snapshot.body,
+            media_type="application/json",
+            headers=cache_headers(snapshot.etag)
+        )
+
+    headers = cache_headers(etag)
+    ids = compatible_ids(db, component_type, params)
+    if params.search:
+        items = search_components(db, component_type, params, ids)
+    else:
+        items, next_cursor = query_components(db, component_type, params, ids)
+        if next_cursor:
+            headers["X-Next-Cursor"] = next_cursor
+
+    return orjson_response(rows_to_dicts(items, CATALOG_SCHEMAS[component_type]), headers=headers)
 
 @router.get("/cpus", response_model=List[CPUModel])
 async def get_cpus(
-    limit: int = Query(50, le=100), 
-    skip: int = Query(0, ge=0),
-    search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    request: Request,
+    params: CatalogParams = Depends(),
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(CPU)
-    
-    if search:
-        search_filter = f"%{search.lower()}%"
-        query = query.filter(
-            or_(
-                func.lower(CPU.name).contains(search_filter),
-                func.lower(CPU.socket).contains(search_filter)
-            )
-        )
-    
-    # Add pagination and ordering for better performance
-    cpus = query.order_by(CPU.price.desc()).offset(skip).limit(limit).all()
-    return cpus
+    return await db.run_sync(_list_catalog, "cpus", params, request.headers.get("if-none-match"))
 
 @router.get("/gpus", response_model=list[GPUModel])
-def get_gpus(db: Session = Depends(get_db)):
-    return db.query(GPU).all()
+async def get_gpus(
+    request: Request,
+    params: CatalogParams = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    return await db.run_sync(_list_catalog, "gpus", params, request.headers.get("if-none-match"))
 
 @router.get("/motherboards", response_model=list[MotherboardModel])
-def get_motherboards(db: Session = Depends(get_db)):
-    return db.query(Motherboard).all()
+async def get_motherboards(
+    request: Request,
+    params: CatalogParams = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    return await db.run_sync(_list_catalog, "motherboards", params, request.headers.get("if-none-match"))
 
 @router.get("/ram", response_model=list[RAMModel])
-def get_rams(db: Session = Depends(get_db)):
-    return db.query(RAM).all()
+async def get_rams(
+    request: Request,
+    params: CatalogParams = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    return await db.run_sync(_list_catalog, "ram", params, request.headers.get("if-none-match"))
 
 @router.get("/storage", response_model=list[StorageModel])
-def get_storages(db: Session = Depends(get_db)):
-    return db.query(Storage).all()
+async def get_storages(
+    request: Request,
+    params: CatalogParams = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    return await db.run_sync(_list_catalog, "storage", params, request.headers.get("if-none-match"))
 
 @router.get("/psus", response_model=list[PSUModel])
-def get_psus(db: Session = Depends(get_db)):
-    return db.query(PSU).all()
+async def get_psus(
+    request: Request,
+    params: CatalogParams = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    return await db.run_sync(_list_catalog, "psus", params, request.headers.get("if-none-match"))
 
 @router.get("/coolers", response_model=list[CoolerModel])
-def get_coolers(db: Session = Depends(get_db)):
-    return db.query(Cooler).all()
+async def get_coolers(
+    request: Request,
+    params: CatalogParams = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    return await db.run_sync(_list_catalog, "coolers", params, request.headers.get("if-none-match"))
 
 @router.get("/cases", response_model=list[CaseModel])
-def get_cases(db: Session = Depends(get_db)):
-    return db.query(Case).all()
+async def get_cases(
+    request: Request,
+    params: CatalogParams = Depends(),
+    db: AsyncSession = Depends(get_db)
+):
+    return await db.run_sync(_list_catalog, "cases", params, request.headers.get("if-none-match"))
+
+@router.get("/catalog")
+async def get_catalog(
+    request: Request,
+    types: Optional[str] = Query(None, description="Comma-separated component types, e.g. cpus,gpus"),
+    format: Literal["rows", "columnar"] = "rows",
+    db: AsyncSession = Depends(get_db)
+):
+    """Return several (by default all) component lists in a single response"""
+    if types:
+        component_types = [t.strip() for t in types.split(",") if t.strip()]
+        unknown = [t for t in component_types if t not in CATALOG_MODELS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown component types: {', '.join(unknown)}")
+        component_types = list(dict.fromkeys(component_types))
+    else:
+        component_types = list(CATALOG_MODELS)
+
+    body, etag = await db.run_sync(catalog_cache.bundle, component_types, format == "columnar")
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag))
+
+# Enough for a few builds side by side
+MAX_BATCH_IDS = 100
+
+@router.get("/components/batch")
+async def get_components_batch(
+    ids: str = Query(..., description="Comma-separated typed ids, e.g. cpu:1,gpu:3,ram:7"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Look up components of mixed types in one request, e.g. everything needed
+    to render a build. Rows come from the catalog cache; anything it does not
+    hold costs at most one query per table.
+    """
+    requested = []
+    for typed_id in (part.strip() for part in ids.split(",")):
+        if not typed_id:
+            continue
+        prefix, _, raw_id = typed_id.partition(":")
+        if prefix not in TYPED_ID_PREFIXES or not raw_id.isdigit():
+            raise HTTPException(status_code=400, detail=f"Invalid component id '{typed_id}'")
+        requested.append((prefix, int(raw_id)))
+
+    requested = list(dict.fromkeys(requested))
+    if len(requested) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} ids per request")
+
+    ids_by_type = {}
+    for prefix, component_id in requested:
+        ids_by_type.setdefault(TYPED_ID_PREFIXES[prefix], set()).add(component_id)
+    found = await db.run_sync(lambda session: {
+        component_type: catalog_cache.lookup(session, component_type, type_ids)
+        for component_type, type_ids in ids_by_type.items()
+    })
+
+    components = {}
+    missing = []
+    for prefix, component_id in requested:
+        row = found[TYPED_ID_PREFIXES[prefix]].get(component_id)
+        if row is None:
+            missing.append(f"{prefix}:{component_id}")
+        else:
+            components[f"{prefix}:{component_id}"] = row
+
+    return orjson_response({"components": components, "missing": missing})
+
+@router.get("/facets/{component_type}")
+async def get_facets(
+    component_type: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Facet counts for the component browser. Any facet field (and price_range)
+    can be passed one or more times to get counts under that selection.
+    """
+    if component_type not in FACET_FIELDS:
+        raise HTTPException(status_code=404, detail=f"Unknown component type: {component_type}")
+
+    index = await db.run_sync(get_facet_index, component_type)
+    selected = {}
+    for field, value in request.query_params.multi_items():
+        if field not in index.fields:
+            raise HTTPException(status_code=400, detail=f"Unknown facet '{field}' for {component_type}")
+        selected.setdefault(field, set()).add(value)
+
+    etag = f'"facets-{component_type}-v{index.version}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+
+    total, facets = index.counts(selected)
+    return orjson_response(
+        {"type": component_type, "version": index.version, "total": total, "facets": facets},
+        headers=cache_headers(etag)
+    )
 
 @router.post("/builds", response_model=SavedBuildOut)
 async def save_build(
     build: SavedBuildCreate,
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-        db_token = db.query(Token).filter(Token.token == token).first()
-        if not db_token:
-            raise HTTPException(status_code=401, detail="Invalid token")
-
-        user = db.query(User).filter(User.id == db_token.user_id).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         new_build = SavedBuild(
             name=build.name,
             purpose=build.purpose,
@@ -101,13 +261,13 @@ async def save_build(
         )
         
         db.add(new_build)
-        db.commit()
-        db.refresh(new_build)
+        await db.commit()
+        await db.refresh(new_build, attribute_names=BUILD_COMPONENTS)
         
-        return new_build
+        return orjson_response(saved_build_dict(new_build))
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Det gick inte att spara datorn: {str(e)}"
@@ -115,21 +275,14 @@ async def save_build(
 
 @router.get("/builds", response_model=list[SavedBuildOut])
 async def get_user_builds(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-
-        db_token = db.query(Token).filter(Token.token == token).first()
-        if not db_token:
-            raise HTTPException(status_code=401, detail="Invalid token")
-
-        user = db.query(User).filter(User.id == db_token.user_id).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        builds = db.query(SavedBuild).filter(SavedBuild.user_id == user.id).all()
-        return builds
+        builds = (await db.scalars(
+            select(SavedBuild).where(SavedBuild.user_id == user.id).options(*_BUILD_LOADERS)
+        )).all()
+        return orjson_response([saved_build_dict(build) for build in builds])
         
     except Exception as e:
         raise HTTPException(
@@ -140,21 +293,12 @@ async def get_user_builds(
 @router.delete("/builds/{build_id}", response_model=dict)
 async def delete_build(
     build_id: int,
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-        # Validate token and get user
-        db_token = db.query(Token).filter(Token.token == token).first()
-        if not db_token:
-            raise HTTPException(status_code=401, detail="Invalid token")
-
-        user = db.query(User).filter(User.id == db_token.user_id).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         # Find the build
-        build = db.query(SavedBuild).filter(SavedBuild.id == build_id).first()
+        build = await db.get(SavedBuild, build_id)
         if not build:
             raise HTTPException(status_code=404, detail="Build not found")
 
@@ -163,13 +307,13 @@ async def delete_build(
             raise HTTPException(status_code=403, detail="Not authorized to delete this build")
 
         # Delete the build
-        db.delete(build)
-        db.commit()
+        await db.delete(build)
+        await db.commit()
         
         return {"message": "Build deleted successfully"}
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Det gick inte att ta bort datorn: {str(e)}"
@@ -177,97 +321,209 @@ async def delete_build(
 
 @router.get("/builds/public", response_model=PublicBuildResponse)
 async def get_published_builds(
-    skip: int = 0,
-    limit: int = 20,
-    purpose: Optional[str] = None,
-    cpu_id: Optional[int] = None,
-    gpu_id: Optional[int] = None,
-    case_id: Optional[int] = None,
-    ram_id: Optional[int] = None,
-    storage_id: Optional[int] = None,
-    cooler_id: Optional[int] = None,
-    psu_id: Optional[int] = None,
-    min_price: Optional[int] = None,
-    max_price: Optional[int] = None,
-    db: Session = Depends(get_db)
+    params: GalleryParams = Depends(),
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-        query = db.query(PublishedBuild).join(SavedBuild)
-        
-        # Apply component filters if provided
-        if purpose:
-            query = query.filter(SavedBuild.purpose == purpose)
-        if cpu_id:
-            query = query.filter(SavedBuild.cpu_id == cpu_id)
-        if gpu_id:
-            query = query.filter(SavedBuild.gpu_id == gpu_id)
-        if case_id:
-            query = query.filter(SavedBuild.case_id == case_id)
-        if ram_id:
-            query = query.filter(SavedBuild.ram_id == ram_id)
-        if storage_id:
-            query = query.filter(SavedBuild.storage_id == storage_id)
-        if cooler_id:
-            query = query.filter(SavedBuild.cooler_id == cooler_id)
-        if psu_id:
-            query = query.filter(SavedBuild.psu_id == psu_id)
-            
-        # Get all builds matching the component filters
-        builds = query.order_by(PublishedBuild.created_at.desc()).all()
-        
-        # Post-filter by price if needed (we need to calculate total price for each build)
-        if min_price is not None or max_price is not None:
-            filtered_builds = []
-            for published_build in builds:
-                # Calculate the total price of the build
-                build = published_build.build
-                total_price = 0
-                
-                # Add up component prices
-                for component_name in ['cpu', 'gpu', 'motherboard', 'ram', 'psu', 'case', 'storage', 'cooler']:
-                    component = getattr(build, component_name, None)
-                    if component and hasattr(component, 'price'):
-                        total_price += component.price or 0
-                
-                # Check if within price range
-                if (min_price is None or total_price >= min_price) and \
-                   (max_price is None or total_price <= max_price):
-                    filtered_builds.append(published_build)
-            
-            # Update builds and count for pagination
-            total = len(filtered_builds)
-            builds = filtered_builds[skip:skip+limit]
-        else:
-            # If no price filtering, apply pagination and get count from query
-            total = query.count()
-            builds = query.order_by(PublishedBuild.created_at.desc()).offset(skip).limit(limit).all()
-        
-        return {"builds": builds, "total": total}
+        return orjson_response(await query_published_builds(db, params))
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Det gick inte att hämta publicerade datorer: {str(e)}"
         )
 
+async def _update_leaderboard(update):
+    # The write is committed by now; a leaderboard miss heals on the next rebuild
+    try:
+        await update
+    except Exception as e:
+        logger.error(f"Leaderboard update failed: {str(e)}")
+
+@router.get("/builds/leaderboard", response_model=LeaderboardResponse)
+async def get_leaderboard(
+    board: Board = "top",
+    purpose: Optional[str] = None,
+    limit: int = Query(5, ge=1, le=LEADERBOARD_SIZE)
+):
+    """Top rated or trending published builds, served from memory"""
+    if purpose and board != "top":
+        raise HTTPException(status_code=400, detail="purpose only applies to board=top")
+    if not await leaderboard.wait_ready():
+        raise HTTPException(
+            status_code=503,
+            detail="Topplistan laddas, försök igen om en stund",
+            headers={"Retry-After": "5"}
+        )
+    return orjson_response({
+        "board": board,
+        "purpose": purpose,
+        "builds": leaderboard.ranked(board, limit, purpose)
+    })
+
+# SavedBuild component column -> catalog type, for validating batch saves
+_BUILD_COMPONENT_TYPES = {f"{prefix}_id": component_type for prefix, component_type in TYPED_ID_PREFIXES.items()}
+
+def _unknown_components(db: Session, builds: list[SavedBuildCreate]) -> list[list[str]]:
+    """Per build, the typed ids (e.g. gpu:7) of components that do not exist"""
+    ids_by_type = {}
+    for build in builds:
+        for column, component_type in _BUILD_COMPONENT_TYPES.items():
+            component_id = getattr(build, column)
+            if component_id is not None:
+                ids_by_type.setdefault(component_type, set()).add(component_id)
+    found = {
+        component_type: catalog_cache.lookup(db, component_type, ids)
+        for component_type, ids in ids_by_type.items()
+    }
+    return [
+        [
+            f"{column[:-3]}:{getattr(build, column)}"
+            for column, component_type in _BUILD_COMPONENT_TYPES.items()
+            if getattr(build, column) is not None and getattr(build, column) not in found[component_type]
+        ]
+        for build in builds
+    ]
+
+async def _batch_targets(db: AsyncSession, ids: list[int], user: AuthenticatedUser) -> tuple[dict, dict]:
+    """
+    Load every requested build in one query. Returns the builds the user may
+    change, and a result for each id they may not.
+    """
+    builds = {
+        build.id: build
+        for build in await db.scalars(select(SavedBuild).where(SavedBuild.id.in_(ids)))
+    }
+    allowed, rejected = {}, {}
+    for build_id in dict.fromkeys(ids):
+        build = builds.get(build_id)
+        if build is None:
+            rejected[build_id] = {"id": build_id, "status": 404, "detail": "Build not found"}
+        elif build.user_id != user.id:
+            rejected[build_id] = {"id": build_id, "status": 403, "detail": "Not authorized to modify this build"}
+        else:
+            allowed[build_id] = build
+    return allowed, rejected
+
+def _batch_response(ids: list[int], outcomes: dict):
+    # Repeated ids get the result of their first occurrence
+    return orjson_response({
+        "results": [{"index": index, **outcomes[build_id]} for index, build_id in enumerate(ids)]
+    })
+
+@router.post("/builds/batch", response_model=BatchResult)
+async def save_builds_batch(
+    batch: SavedBuildBatchCreate,
+    user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Save several builds in one transaction. Builds that reference components
+    that do not exist are reported and skipped; the rest are saved together.
+    """
+    try:
+        unknown = await db.run_sync(_unknown_components, batch.builds)
+        results = []
+        created = []
+        for index, (build, missing) in enumerate(zip(batch.builds, unknown)):
+            if missing:
+                results.append({"index": index, "status": 400, "detail": f"Unknown components: {', '.join(missing)}"})
+                continue
+            new_build = SavedBuild(
+                name=build.name,
+                purpose=build.purpose,
+                user_id=user.id,
+                **{column: getattr(build, column) for column in _BUILD_COMPONENT_TYPES}
+            )
+            db.add(new_build)
+            created.append((index, new_build))
+            results.append(None)
+
+        await db.commit()
+        for index, new_build in created:
+            results[index] = {"index": index, "id": new_build.id, "status": 201}
+        return orjson_response({"results": results})
+
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Det gick inte att spara datorerna: {str(e)}"
+        )
+
+@router.post("/builds/batch/delete", response_model=BatchResult)
+async def delete_builds_batch(
+    batch: BuildIdBatch,
+    user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete several of the user's builds in one transaction"""
+    try:
+        builds, outcomes = await _batch_targets(db, batch.ids, user)
+        for build_id, build in builds.items():
+            if build.is_published:
+                # The gallery entry and its ratings still point at it
+                outcomes[build_id] = {"id": build_id, "status": 409, "detail": "Build is published"}
+                continue
+            await db.delete(build)
+            outcomes[build_id] = {"id": build_id, "status": 200}
+
+        await db.commit()
+        return _batch_response(batch.ids, outcomes)
+
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Det gick inte att ta bort datorerna: {str(e)}"
+        )
+
+# Declared before /builds/{build_id}/publish so "batch" is not read as an id
+@router.post("/builds/batch/publish", response_model=BatchResult)
+async def publish_builds_batch(
+    batch: BuildIdBatch,
+    user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Publish several of the user's builds in one transaction"""
+    try:
+        builds, outcomes = await _batch_targets(db, batch.ids, user)
+        published = {}
+        for build_id, build in builds.items():
+            if build.is_published:
+                outcomes[build_id] = {"id": build_id, "status": 200, "detail": "Build is already published"}
+                continue
+            build.is_published = True
+            published[build_id] = PublishedBuild(build_id=build.id, user_id=user.id)
+            db.add(published[build_id])
+
+        await db.commit()
+        for build_id, published_build in published.items():
+            outcomes[build_id] = {"id": build_id, "published_id": published_build.id, "status": 201}
+        if published:
+            await _update_leaderboard(leaderboard.record_publish(
+                db, *(published_build.id for published_build in published.values())
+            ))
+        return _batch_response(batch.ids, outcomes)
+
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Det gick inte att publicera datorerna: {str(e)}"
+        )
+
 @router.post("/builds/{build_id}/publish", response_model=dict)
 async def publish_build(
     build_id: int,
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-        # Validate token and get user
-        db_token = db.query(Token).filter(Token.token == token).first()
-        if not db_token:
-            raise HTTPException(status_code=401, detail="Invalid token")
-
-        user = db.query(User).filter(User.id == db_token.user_id).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
         # Find the build
-        build = db.query(SavedBuild).filter(SavedBuild.id == build_id).first()
+        build = await db.get(SavedBuild, build_id)
         if not build:
             raise HTTPException(status_code=404, detail="Build not found")
 
@@ -289,12 +545,15 @@ async def publish_build(
         )
         
         db.add(published_build)
-        db.commit()
+        await db.commit()
+        await _update_leaderboard(leaderboard.record_publish(db, published_build.id))
         
         return {"message": "Build published successfully"}
         
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Det gick inte att publicera datorn: {str(e)}"
@@ -304,68 +563,28 @@ async def publish_build(
 async def rate_build(
     published_build_id: int,
     rating_data: BuildRatingCreate,
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    user: AuthenticatedUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-        # Validate token and get user
-        db_token = db.query(Token).filter(Token.token == token).first()
-        if not db_token:
-            raise HTTPException(status_code=401, detail="Invalid token")
-
-        user = db.query(User).filter(User.id == db_token.user_id).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        # Check if published build exists
-        published_build = db.query(PublishedBuild).filter(PublishedBuild.id == published_build_id).first()
-        if not published_build:
-            raise HTTPException(status_code=404, detail="Published build not found")
-            
         # Validate rating is between 0 and 5
         if rating_data.rating < 0 or rating_data.rating > 5:
             raise HTTPException(status_code=400, detail="Rating must be between 0 and 5")
 
-        # Check if user has already rated this build
-        existing_rating = db.query(BuildRating).filter(
-            BuildRating.published_build_id == published_build_id,
-            BuildRating.user_id == user.id
-        ).first()
-        
-        if existing_rating:
-            # Update existing rating
-            old_rating = existing_rating.rating
-            existing_rating.rating = rating_data.rating
-            existing_rating.comment = rating_data.comment
-            
-            # Update average rating
-            total_rating = (published_build.avg_rating * published_build.rating_count) - old_rating + rating_data.rating
-            published_build.avg_rating = total_rating / published_build.rating_count
-            
-            db.commit()
-            db.refresh(existing_rating)
-            return existing_rating
-        else:
-            # Create new rating
-            new_rating = BuildRating(
-                published_build_id=published_build_id,
-                user_id=user.id,
-                rating=rating_data.rating,
-                comment=rating_data.comment
-            )
-            db.add(new_rating)
-            
-            # Update build's average rating
-            total_rating = (published_build.avg_rating * published_build.rating_count) + rating_data.rating
-            published_build.rating_count += 1
-            published_build.avg_rating = total_rating / published_build.rating_count
-            
-            db.commit()
-            db.refresh(new_rating)
-            return new_rating
+        # Check if published build exists
+        if await db.scalar(select(PublishedBuild.id).where(PublishedBuild.id == published_build_id)) is None:
+            raise HTTPException(status_code=404, detail="Published build not found")
+
+        rating, totals = await apply_rating(
+            db, published_build_id, user.id, rating_data.rating, rating_data.comment
+        )
+        await _update_leaderboard(leaderboard.record_rating(db, totals, rating_data.rating))
+        return orjson_response(rating_dict(rating))
         
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Det gick inte att betygsätta bygget: {str(e)}"
@@ -374,19 +593,25 @@ async def rate_build(
 @router.get("/builds/public/{published_build_id}/ratings", response_model=list[BuildRatingOut])
 async def get_build_ratings(
     published_build_id: int,
-    db: Session = Depends(get_db)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
 ):
     try:
         # Check if published build exists
-        published_build = db.query(PublishedBuild).filter(PublishedBuild.id == published_build_id).first()
+        published_build = await db.get(PublishedBuild, published_build_id)
         if not published_build:
             raise HTTPException(status_code=404, detail="Published build not found")
             
-        ratings = db.query(BuildRating).filter(
-            BuildRating.published_build_id == published_build_id
-        ).order_by(BuildRating.created_at.desc()).all()
+        ratings = (await db.scalars(
+            select(BuildRating)
+            .where(BuildRating.published_build_id == published_build_id)
+            .order_by(BuildRating.created_at.desc(), BuildRating.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )).all()
         
-        return ratings
+        return orjson_response([rating_dict(rating) for rating in ratings])
         
     except Exception as e:
         raise HTTPException(
@@ -397,16 +622,26 @@ async def get_build_ratings(
 @router.get("/builds/public/{published_build_id}", response_model=PublishedBuildOut)
 async def get_published_build(
     published_build_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
-        # Get the published build with the given ID
-        published_build = db.query(PublishedBuild).filter(PublishedBuild.id == published_build_id).first()
-        if not published_build:
-            raise HTTPException(status_code=404, detail="Published build not found")
+        body = published_build_cache.get(published_build_id)
+        if body is None:
+            generation = published_build_cache.generation()
+            # Get the published build with the given ID
+            published_build = await db.scalar(
+                select(PublishedBuild).where(PublishedBuild.id == published_build_id).options(*_PUBLISHED_LOADERS)
+            )
+            if not published_build:
+                raise HTTPException(status_code=404, detail="Published build not found")
+
+            body = orjson.dumps(published_build_dict(published_build))
+            published_build_cache.put(published_build_id, body, published_build.build, generation)
             
-        return published_build
+        return Response(content=body, media_type="application/json")
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -414,7 +649,7 @@ async def get_published_build(
         )
 
 @router.get("/extras")
-def get_extras(db: Session = Depends(get_db)):
+async def get_extras(db: AsyncSession = Depends(get_db)):
     """Return extra/optional components or accessories for PC builds"""
     # This is a placeholder endpoint, now enhanced with a reference to AI recommendations
     return [
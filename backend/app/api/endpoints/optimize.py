@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from core.deps import get_current_user
 from schemas import OptimizationRequest, OptimizedBuildOut, ComponentAnalysis
@@ -21,7 +22,7 @@ logger = logging.getLogger(__name__)
 class BuildOptimizer:
     """Separate class to handle build optimization logic"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.max_components = 3
     
@@ -35,13 +36,13 @@ class BuildOptimizer:
             return float(match.group(1))
         return None
     
-    def get_current_components(self, request: OptimizationRequest) -> Dict[str, Any]:
+    async def get_current_components(self, request: OptimizationRequest) -> Dict[str, Any]:
         """Extract and format current component details from request"""
         current_components = {}
         
         # Extract CPU details
         if request.cpu_id:
-            cpu = self.db.query(CPU).filter(CPU.id == request.cpu_id).first()
+            cpu = await self.db.get(CPU, request.cpu_id)
             if cpu:
                 current_components["cpu"] = {
                     "id": cpu.id,
@@ -53,7 +54,7 @@ class BuildOptimizer:
         
         # Extract GPU details
         if request.gpu_id:
-            gpu = self.db.query(GPU).filter(GPU.id == request.gpu_id).first()
+            gpu = await self.db.get(GPU, request.gpu_id)
             if gpu:
                 current_components["gpu"] = {
                     "id": gpu.id,
@@ -157,7 +158,7 @@ class BuildOptimizer:
 async def optimize_build(
     request: OptimizationRequest,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
         logger.info("Received optimization request for purpose: %s", request.purpose)
@@ -166,7 +167,7 @@ async def optimize_build(
         optimizer = BuildOptimizer(db)
         
         # Get current components
-        current_components = optimizer.get_current_components(request)
+        current_components = await optimizer.get_current_components(request)
         
         # Analyze compatibility and requirements
         purpose = request.purpose or "general use"
@@ -196,7 +197,7 @@ async def optimize_build(
             "message": "An error occurred while optimizing the build."
         }
 
-async def get_component_recommendations(purpose: str, current_components: Dict, db: Session) -> Dict[str, List]:
+async def get_component_recommendations(purpose: str, current_components: Dict, db: AsyncSession) -> Dict[str, List]:
     """Get component recommendations using ChromaDB with diversity controls"""
     recommendations = {}
     max_components = 3
@@ -232,8 +233,10 @@ async def get_component_recommendations(purpose: str, current_components: Dict,
         try:
             logger.info(f"Searching for {component_key} with purpose: {purpose}")
             
-            # Use type-specific search with diversity
-            results = search_components_by_type(
+            # Use type-specific search with diversity. The Chroma client is
+            # blocking, so keep it off the event loop
+            results = await run_in_threadpool(
+                search_components_by_type,
                 component_type=chroma_type,
                 purpose=purpose,
                 n_results=max_components,
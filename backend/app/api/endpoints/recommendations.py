@@ -1,11 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
 from typing import Dict, Any, List, Optional
-from database import get_db
 from core.deps import get_current_user
 from fastapi.security import OAuth2PasswordBearer
 import logging
-from models import CPU, GPU, Motherboard, RAM, Storage, PSU, Cooler, Case
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -46,8 +43,7 @@ class RecommendationRequest(BaseModel):
 @router.post("", response_model=RecommendationResponse)
 async def get_recommendations(
     request: RecommendationRequest,
-    current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user = Depends(get_current_user)
 ):
     """
     Analyze the current build and provide AI recommendations for improvements
@@ -0,0 +1,103 @@
+"""
+Compare the default FastAPI response path (response_model validation +
+jsonable_encoder + stdlib json) with the orjson fast path used by the
+catalog and gallery endpoints.
+
+Run from backend/app:
+
+    python -m benchmarks.serialization
+"""
+from datetime import datetime
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from models import Base, CPU, GPU, Motherboard, RAM, PSU, Case, Storage, Cooler, SavedBuild, PublishedBuild
+from schemas import CPUModel, PublicBuildResponse
+from core.gallery import summary_query
+from core.serialization import dump_rows, published_build_summary_dict
+import json
+import orjson
+import timeit
+
+SIZES = (1_000, 10_000)
+REPEATS = 5
+
+
+def make_cpus(n: int) -> list:
+    return [
+        CPU(id=i, name=f"AMD Ryzen 7 {i}", brand="AMD", socket="AM5", cores=8,
+            threads=16, base_clock=4.2, cache=32, price=2990.0 + i)
+        for i in range(n)
+    ]
+
+
+def gallery_rows(n: int) -> list:
+    """
+    n published builds as the gallery reads them: summary_query() rows from
+    an in-memory SQLite database holding one part of each type.
+    """
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    parts = {
+        "cpu_id": CPU(name="Ryzen 7 7800X3D", brand="AMD", socket="AM5", cores=8, price=4490.0),
+        "gpu_id": GPU(name="RTX 4070 Super", brand="NVIDIA", memory="12 GB", price=6990.0),
+        "motherboard_id": Motherboard(name="B650", brand="ASUS", socket="AM5", form_factor="ATX",
+                                      chipset="B650", memory_type="DDR5", price=1990.0),
+        "ram_id": RAM(name="Fury Beast 32GB", brand="Kingston", capacity=32, speed=6000, price=1389.0),
+        "psu_id": PSU(name="RM850e", brand="Corsair", wattage=850, price=1290.0),
+        "case_id": Case(name="North", brand="Fractal", form_factor="ATX", price=1490.0),
+        "storage_id": Storage(name="KC3000 1TB", type="SSD", capacity=1000, price=890.0),
+        "cooler_id": Cooler(name="NH-D15", brand="Noctua", type="Air", price=1190.0),
+    }
+    with Session(engine) as db:
+        db.add_all(parts.values())
+        db.flush()
+        part_ids = {column: part.id for column, part in parts.items()}
+        # Core inserts skip the ORM flush hooks; the stored total is set directly
+        db.execute(insert(SavedBuild), [
+            dict(id=i + 1, name=f"Build {i}", purpose="1440p Gaming", user_id=1, total_price=20_720.0,
+                 created_at=now, updated_at=now, **part_ids)
+            for i in range(n)
+        ])
+        db.execute(insert(PublishedBuild), [
+            dict(id=i + 1, build_id=i + 1, user_id=1, avg_rating=4.0, rating_count=3, rating_sum=12.0, created_at=now)
+            for i in range(n)
+        ])
+        return db.execute(summary_query()).all()
+
+
+def default_path(adapter: TypeAdapter, content) -> bytes:
+    # What FastAPI does with a response_model: validate, encode, json.dumps
+    validated = adapter.validate_python(content, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def best_of(fn) -> float:
+    return min(timeit.repeat(fn, number=1, repeat=REPEATS)) * 1000
+
+
+def main():
+    cpu_adapter = TypeAdapter(list[CPUModel])
+    gallery_adapter = TypeAdapter(PublicBuildResponse)
+
+    print(f"{'payload':<24}{'rows':>8}{'default ms':>14}{'orjson ms':>12}{'speedup':>10}")
+    for n in SIZES:
+        cpus = make_cpus(n)
+        default_ms = best_of(lambda: default_path(cpu_adapter, cpus))
+        fast_ms = best_of(lambda: dump_rows(cpus, CPUModel))
+        print(f"{'CPUModel list':<24}{n:>8}{default_ms:>14.1f}{fast_ms:>12.1f}{default_ms / fast_ms:>9.1f}x")
+
+        rows = gallery_rows(n)
+        default_ms = best_of(lambda: default_path(gallery_adapter, {
+            "builds": [published_build_summary_dict(row) for row in rows], "total": n, "next_cursor": None
+        }))
+        fast_ms = best_of(lambda: orjson.dumps({
+            "builds": [published_build_summary_dict(row) for row in rows], "total": n, "next_cursor": None
+        }))
+        print(f"{'PublicBuildResponse':<24}{n:>8}{default_ms:>14.1f}{fast_ms:>12.1f}{default_ms / fast_ms:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
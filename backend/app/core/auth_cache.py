@@ -0,0 +1,182 @@
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models import Token, User
+from core.settings import settings
+from core.tokens import is_signed_token, verify_signed_token, revocations
+from cachetools import TTLCache
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import hashlib
+import threading
+
+# How long a resolved token is trusted without asking the database again.
+# Logout, refresh and deactivation in this process invalidate entries at once;
+# changes made by other workers show up within this many seconds.
+AUTH_CACHE_TTL = 60.0
+
+# Upper bound on cached tokens per worker
+AUTH_CACHE_SIZE = 10_000
+
+
+class AuthenticatedUser:
+    """
+    The user columns request handlers read, resolved from a bearer token.
+
+    Plain values rather than an ORM row so a cache entry never holds on to a
+    session, and nothing can lazy load through it.
+    """
+
+    __slots__ = ("id", "email", "created_at", "is_active", "token_created")
+
+    def __init__(self, id: int, email: str, created_at: datetime, is_active: bool, token_created: datetime):
+        self.id = id
+        self.email = email
+        self.created_at = created_at
+        self.is_active = is_active
+        self.token_created = token_created
+
+    def token_expired(self) -> bool:
+        created = self.token_created
+        if created.tzinfo is None:
+            # The column is stored without a time zone; tokens are created in UTC
+            created = created.replace(tzinfo=timezone.utc)
+        max_age = timedelta(minutes=int(settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+        return created < datetime.now(timezone.utc) - max_age
+
+
+def token_key(token: str) -> str:
+    """Cache key for a bearer token, so the raw tokens are not kept in memory."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class AuthCache:
+    def __init__(self, maxsize: int = AUTH_CACHE_SIZE, ttl: float = AUTH_CACHE_TTL):
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[AuthenticatedUser]:
+        with self._lock:
+            user = self._entries.get(token_key(token))
+        if user is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return user
+
+    def put(self, token: str, user: AuthenticatedUser):
+        with self._lock:
+            self._entries[token_key(token)] = user
+
+    def invalidate_token(self, token: str):
+        with self._lock:
+            self._entries.pop(token_key(token), None)
+
+    def invalidate_user(self, user_id: int):
+        """Drop every cached token of a user (deactivation, deletion)."""
+        with self._lock:
+            for key in [key for key, user in self._entries.items() if user.id == user_id]:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+auth_cache = AuthCache()
+
+
+async def resolve_token(db: AsyncSession, token: str) -> Optional[AuthenticatedUser]:
+    """
+    Look up the user behind a bearer token: from the cache, or with a single
+    Token/User join on a miss. Returns None for unknown tokens.
+    """
+    if is_signed_token(token):
+        return await _resolve_signed_token(db, token)
+
+    user = auth_cache.get(token)
+    if user is not None:
+        return user
+
+    row = (await db.execute(
+        select(
+            Token.created,
+            User.id,
+            User.email,
+            User.created_at,
+            User.is_active
+        )
+        .join(User, Token.user_id == User.id)
+        .where(Token.token == token)
+    )).first()
+    if row is None:
+        return None
+
+    user = AuthenticatedUser(
+        id=row.id,
+        email=row.email,
+        created_at=row.created_at,
+        is_active=row.is_active is not False,
+        token_created=row.created
+    )
+    auth_cache.put(token, user)
+    return user
+
+
+async def _resolve_signed_token(db: AsyncSession, token: str) -> Optional[AuthenticatedUser]:
+    """
+    Signed tokens are checked without the database: signature, expiry and
+    the in-memory revocation list. Only the user's columns are looked up,
+    once per token per cache lifetime.
+    """
+    claims = verify_signed_token(token)
+    if claims is None:
+        return None
+    await revocations.sync(db)
+    if revocations.is_revoked(claims.jti):
+        return None
+
+    user = auth_cache.get(token)
+    if user is not None:
+        return user
+
+    row = (await db.execute(
+        select(User.id, User.email, User.created_at, User.is_active).where(User.id == claims.user_id)
+    )).first()
+    if row is None:
+        return None
+
+    user = AuthenticatedUser(
+        id=row.id,
+        email=row.email,
+        created_at=row.created_at,
+        is_active=row.is_active is not False,
+        token_created=claims.issued_at
+    )
+    auth_cache.put(token, user)
+    return user
+
+
+@event.listens_for(Session, "after_flush")
+def _track_user_writes(session, flush_context):
+    # Deactivating or deleting a user has to end their cached sessions too
+    users = {
+        obj.id for obj in session.deleted if isinstance(obj, User)
+    } | {
+        obj.id for obj in session.dirty if isinstance(obj, User) and session.is_modified(obj)
+    }
+    if users:
+        session.info.setdefault("auth_invalidated_users", set()).update(users)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_user_commit(session):
+    for user_id in session.info.pop("auth_invalidated_users", ()):
+        auth_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_auth_after_rollback(session):
+    session.info.pop("auth_invalidated_users", None)
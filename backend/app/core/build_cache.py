@@ -0,0 +1,141 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import BuildRating, PublishedBuild, SavedBuild
+from core.catalog import TYPED_ID_PREFIXES
+from core.catalog_cache import on_catalog_commit
+from cachetools import TTLCache
+from typing import Iterable, Optional
+import threading
+
+# Writes made through this worker invalidate entries as they commit; writes
+# made by other workers show up within this many seconds
+BUILD_CACHE_TTL = 30.0
+
+# Upper bound on cached published builds per worker
+BUILD_CACHE_SIZE = 2_000
+
+# Catalog type -> the SavedBuild column that references it
+_COLUMN_BY_TYPE = {component_type: f"{prefix}_id" for prefix, component_type in TYPED_ID_PREFIXES.items()}
+
+
+class _Entry:
+    __slots__ = ("body", "build_id", "components")
+
+    def __init__(self, body: bytes, build_id: int, components: frozenset):
+        self.body = body
+        self.build_id = build_id
+        self.components = components
+
+
+class PublishedBuildCache:
+    """
+    Serialized PublishedBuildOut bodies by published build id.
+
+    Each entry remembers the saved build and components it was rendered from,
+    so a rating, a build change or a component change drops exactly the
+    entries that showed it.
+    """
+
+    def __init__(self, maxsize: int = BUILD_CACHE_SIZE, ttl: float = BUILD_CACHE_TTL):
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        # Bumped by every invalidation. A body read from the database before
+        # an invalidation may already be stale, so it is not stored.
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, published_build_id: int) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(published_build_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.body
+
+    def put(self, published_build_id: int, body: bytes, build, generation: int):
+        """Store a body rendered from `build` (a SavedBuild) if nothing was invalidated since `generation`."""
+        components = frozenset(
+            (column, getattr(build, column))
+            for column in _COLUMN_BY_TYPE.values()
+            if getattr(build, column) is not None
+        )
+        with self._lock:
+            if generation == self._generation:
+                self._entries[published_build_id] = _Entry(body, build.id, components)
+
+    def _drop(self, keys: Iterable[int]):
+        with self._lock:
+            self._generation += 1
+            for key in list(keys):
+                self._entries.pop(key, None)
+
+    def invalidate(self, published_build_ids: Iterable[int]):
+        self._drop(published_build_ids)
+
+    def invalidate_builds(self, build_ids: set[int]):
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry.build_id in build_ids]
+        self._drop(keys)
+
+    def invalidate_components(self, components: set[tuple[str, int]]):
+        """`components` holds (SavedBuild column, component id) pairs."""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry.components & components]
+        self._drop(keys)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+published_build_cache = PublishedBuildCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_build_writes(session, flush_context):
+    published, builds = set(), set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, BuildRating):
+            published.add(obj.published_build_id)
+        elif isinstance(obj, PublishedBuild):
+            published.add(obj.id)
+        elif isinstance(obj, SavedBuild) and obj not in session.new:
+            builds.add(obj.id)
+    if published:
+        session.info.setdefault("build_cache_published", set()).update(published)
+    if builds:
+        session.info.setdefault("build_cache_builds", set()).update(builds)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_build_commit(session):
+    published = session.info.pop("build_cache_published", None)
+    builds = session.info.pop("build_cache_builds", None)
+    if published:
+        published_build_cache.invalidate(published)
+    if builds:
+        published_build_cache.invalidate_builds(builds)
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_build_cache_after_rollback(session):
+    session.info.pop("build_cache_published", None)
+    session.info.pop("build_cache_builds", None)
+
+
+@on_catalog_commit
+def _invalidate_changed_components(changes, version):
+    # Names, prices and the stored total all come from the components
+    published_build_cache.invalidate_components({
+        (_COLUMN_BY_TYPE[component_type], component_id)
+        for component_type, component_id, _ in changes
+    })
@@ -0,0 +1,153 @@
+from sqlalchemy import event, func, inspect, select, update, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from models import CPU, GPU, Motherboard, RAM, PSU, Case, Storage, Cooler, SavedBuild
+from functools import reduce
+from operator import add
+from typing import Callable, Iterable, Optional
+
+# Foreign key on SavedBuild -> component model it points at
+BUILD_PRICE_COLUMNS = {
+    "cpu_id": CPU,
+    "gpu_id": GPU,
+    "motherboard_id": Motherboard,
+    "ram_id": RAM,
+    "psu_id": PSU,
+    "case_id": Case,
+    "storage_id": Storage,
+    "cooler_id": Cooler,
+}
+
+_COLUMN_BY_MODEL = {model: column for column, model in BUILD_PRICE_COLUMNS.items()}
+
+
+class DerivedColumn:
+    """
+    A SavedBuild column computed in SQL from the build and its components:
+    recomputed when one of `build_columns` changes on the build, or
+    `component_column` changes on one of its components.
+    """
+
+    def __init__(
+        self,
+        expression: Callable,
+        build_columns: Iterable[str],
+        component_column: str,
+        on_refresh: Optional[Callable] = None
+    ):
+        self.expression = expression
+        self.build_columns = tuple(build_columns)
+        self.component_column = component_column
+        # Called with the session after a flush recomputed the column
+        self.on_refresh = on_refresh
+
+
+# SavedBuild column name -> DerivedColumn. All of them are kept current by
+# one UPDATE after each flush that changes any of their inputs.
+DERIVED_COLUMNS: dict[str, DerivedColumn] = {}
+
+
+def derived_build_column(column: str, build_columns: Iterable[str], component_column: str, on_refresh=None):
+    """Register the decorated function as the SQL expression of a derived SavedBuild column."""
+    def register(expression):
+        DERIVED_COLUMNS[column] = DerivedColumn(expression, build_columns, component_column, on_refresh)
+        return expression
+    return register
+
+
+@derived_build_column("total_price", BUILD_PRICE_COLUMNS, "price")
+def total_price_expression():
+    """SQL expression for a SavedBuild's summed component prices; missing parts count as 0."""
+    prices = [
+        func.coalesce(
+            select(model.price).where(model.id == getattr(SavedBuild, column)).scalar_subquery(),
+            0
+        )
+        for column, model in BUILD_PRICE_COLUMNS.items()
+    ]
+    return reduce(add, prices)
+
+
+def refresh_build_columns(connection, columns: Iterable[str], *where) -> dict:
+    """
+    Recompute the derived `columns` for the builds matching `where` (all
+    builds when empty) in one UPDATE, inside the caller's transaction.
+    Returns the new values as rows by build id.
+    """
+    columns = list(columns)
+    stmt = (
+        update(SavedBuild)
+        # Repricing or renaming a part is not an edit; keep updated_at from firing its onupdate
+        .values(updated_at=SavedBuild.updated_at, **{column: DERIVED_COLUMNS[column].expression() for column in columns})
+        .returning(SavedBuild.id, *(getattr(SavedBuild, column) for column in columns))
+        .execution_options(synchronize_session=False)
+    )
+    if where:
+        stmt = stmt.where(*where)
+    return {row.id: row for row in connection.execute(stmt)}
+
+
+def refresh_total_prices(connection, *where) -> dict[int, float]:
+    """
+    Recompute total_price for the builds matching `where` (all builds when
+    empty) in one UPDATE, inside the caller's transaction. Returns the new
+    totals by build id.
+
+    Scripts that change component prices with plain SQL should call this with
+    the affected foreign keys, e.g. SavedBuild.gpu_id.in_(ids).
+    """
+    return {build_id: row.total_price for build_id, row in refresh_build_columns(connection, ["total_price"], *where).items()}
+
+
+def _changed(obj, columns: Iterable[str]) -> bool:
+    state = inspect(obj)
+    return any(state.attrs[column].history.has_changes() for column in columns)
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_derived_columns(session, flush_context):
+    builds = {}
+    changed_parts: dict[str, set[int]] = {}
+    stale: set[str] = set()
+
+    for obj in session.new:
+        if isinstance(obj, SavedBuild):
+            builds[obj.id] = obj
+            stale.update(DERIVED_COLUMNS)
+    for obj in session.dirty:
+        if isinstance(obj, SavedBuild):
+            changed = {name for name, derived in DERIVED_COLUMNS.items() if _changed(obj, derived.build_columns)}
+            if changed:
+                builds[obj.id] = obj
+                stale |= changed
+            continue
+        column = _COLUMN_BY_MODEL.get(type(obj))
+        if column is None:
+            continue
+        changed = {name for name, derived in DERIVED_COLUMNS.items() if _changed(obj, [derived.component_column])}
+        if changed:
+            changed_parts.setdefault(column, set()).add(obj.id)
+            stale |= changed
+
+    conditions = [getattr(SavedBuild, column).in_(ids) for column, ids in changed_parts.items()]
+    if builds:
+        conditions.append(SavedBuild.id.in_(builds))
+    if not conditions:
+        return
+
+    # Builds affected through different inputs share the UPDATE; recomputing
+    # a column whose inputs did not change just writes the same value back
+    columns = [name for name in DERIVED_COLUMNS if name in stale]
+    rows = refresh_build_columns(session.connection(), columns, or_(*conditions))
+
+    # The UPDATE bypassed the ORM; copy the values onto builds already loaded.
+    # Builds inserted by this flush are not in the identity map yet.
+    for build_id, row in rows.items():
+        build = builds.get(build_id) or session.identity_map.get(session.identity_key(SavedBuild, build_id))
+        if build is not None:
+            for column in columns:
+                set_committed_value(build, column, getattr(row, column))
+
+    for column in columns:
+        if DERIVED_COLUMNS[column].on_refresh:
+            DERIVED_COLUMNS[column].on_refresh(session)
@@ -0,0 +1,162 @@
+from sqlalchemy import event, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models import PublishedBuild, SavedBuild
+from core.build_prices import BUILD_PRICE_COLUMNS, derived_build_column, refresh_build_columns
+from core.catalog_cache import on_catalog_commit
+from core.search import words
+from collections import defaultdict
+from functools import reduce
+from typing import Iterable, Optional
+import math
+import threading
+import time
+
+# Text search configurations a build is indexed and queried with. Build names
+# and purposes are written in both languages ("Video Redigering", "1440p Gaming").
+# Must match the expression index created by migration 7c1e5b9d42a3.
+SEARCH_CONFIGS = ("swedish", "english")
+
+# How long a worker trusts its in-memory index when it has not seen a write;
+# writes through other workers show up within this many seconds
+BUILD_SEARCH_INDEX_TTL = 60.0
+
+# SavedBuild columns that end up in the search document
+_DOCUMENT_COLUMNS = ("name", "purpose", *BUILD_PRICE_COLUMNS)
+
+
+def _mark_index_stale(session):
+    session.info["build_search_stale"] = True
+
+
+@derived_build_column("search_document", _DOCUMENT_COLUMNS, "name", on_refresh=_mark_index_stale)
+def search_document_expression():
+    """SQL expression for a SavedBuild's search text: name, purpose and component names."""
+    parts = [SavedBuild.name, SavedBuild.purpose] + [
+        select(model.name).where(model.id == getattr(SavedBuild, column)).scalar_subquery()
+        for column, model in BUILD_PRICE_COLUMNS.items()
+    ]
+    return reduce(lambda left, right: left + " " + right, [func.coalesce(part, "") for part in parts])
+
+
+def uses_full_text_search(db) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _config(name: str):
+    # Inlined rather than bound, so the planner can match the expression index
+    return literal_column(f"'{name}'::regconfig")
+
+
+def search_vector():
+    return reduce(
+        lambda left, right: left.op("||")(right),
+        [func.to_tsvector(_config(name), SavedBuild.search_document) for name in SEARCH_CONFIGS]
+    )
+
+
+def search_query(q: str):
+    """Web-style query (quotes, OR, -word) matched in any of SEARCH_CONFIGS."""
+    return reduce(
+        lambda left, right: left.op("||")(right),
+        [func.websearch_to_tsquery(_config(name), q) for name in SEARCH_CONFIGS]
+    )
+
+
+class BuildSearchIndex:
+    """
+    In-memory inverted index over the search documents of published builds,
+    for backends without full-text search. Every query word has to match a
+    whole word; matches are ranked by tf-idf.
+    """
+
+    def __init__(self, documents: Iterable[tuple[int, str]]):
+        self._postings: dict[str, dict[int, int]] = defaultdict(dict)
+        self._size = 0
+        for doc_id, text in documents:
+            self._size += 1
+            for token in words(text or ""):
+                postings = self._postings[token]
+                postings[doc_id] = postings.get(doc_id, 0) + 1
+
+    def search(self, query: str) -> dict[int, float]:
+        """Score by published build id for builds matching every query word."""
+        terms = set(words(query))
+        postings = [self._postings.get(term) for term in terms]
+        if not postings or any(posting is None for posting in postings):
+            return {}
+
+        postings.sort(key=len)
+        matches = set(postings[0]).intersection(*postings[1:])
+        scores = dict.fromkeys(matches, 0.0)
+        for posting in postings:
+            idf = math.log(1 + self._size / len(posting))
+            for doc_id in matches:
+                count = posting[doc_id]
+                scores[doc_id] += idf * count / (count + 1.2)
+        return scores
+
+
+_index: Optional[tuple[float, BuildSearchIndex]] = None
+_index_lock = threading.Lock()
+# Bumped by every expiry, so an index read from the database before a
+# write committed is not kept
+_generation = 0
+
+
+def expire_build_search_index():
+    global _index, _generation
+    with _index_lock:
+        _index = None
+        _generation += 1
+
+
+async def get_build_search_index(db: AsyncSession) -> BuildSearchIndex:
+    """The in-memory index, rebuilt after local writes or when older than the TTL."""
+    global _index
+    cached = _index
+    if cached is not None and time.monotonic() - cached[0] < BUILD_SEARCH_INDEX_TTL:
+        return cached[1]
+
+    generation, built_at = _generation, time.monotonic()
+    rows = (await db.execute(
+        select(PublishedBuild.id, SavedBuild.search_document)
+        .join(SavedBuild, SavedBuild.id == PublishedBuild.build_id)
+    )).all()
+    index = BuildSearchIndex(rows)
+    with _index_lock:
+        if generation == _generation:
+            _index = (built_at, index)
+    return index
+
+
+def refresh_search_documents(connection, *where) -> dict[int, str]:
+    """
+    Recompute search_document for the builds matching `where` in one UPDATE,
+    like refresh_total_prices. Returns the new documents by build id.
+    """
+    return {build_id: row.search_document for build_id, row in refresh_build_columns(connection, ["search_document"], *where).items()}
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_stale_on_publish(session, flush_context):
+    # The index only covers published builds
+    if any(isinstance(obj, PublishedBuild) for obj in (*session.new, *session.deleted)):
+        _mark_index_stale(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _expire_search_index_after_commit(session):
+    if session.info.pop("build_search_stale", False):
+        expire_build_search_index()
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_build_search_after_rollback(session):
+    session.info.pop("build_search_stale", None)
+
+
+@on_catalog_commit
+def _expire_search_index_on_catalog_change(changes, version):
+    # Component names are part of every document that references them
+    expire_build_search_index()
@@ -0,0 +1,269 @@
+from fastapi import HTTPException, Query
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+from models import CPU, GPU, Motherboard, RAM, Storage, PSU, Cooler, Case
+from schemas import CPUModel, GPUModel, MotherboardModel, RAMModel, StorageModel, PSUModel, CoolerModel, CaseModel
+from typing import Optional, Literal, Any, Annotated
+import base64
+import json
+
+# Component tables served by the catalog endpoints, keyed by their URL segment
+CATALOG_MODELS = {
+    "cpus": CPU,
+    "gpus": GPU,
+    "motherboards": Motherboard,
+    "ram": RAM,
+    "storage": Storage,
+    "psus": PSU,
+    "coolers": Cooler,
+    "cases": Case,
+}
+
+CATALOG_SCHEMAS = {
+    "cpus": CPUModel,
+    "gpus": GPUModel,
+    "motherboards": MotherboardModel,
+    "ram": RAMModel,
+    "storage": StorageModel,
+    "psus": PSUModel,
+    "coolers": CoolerModel,
+    "cases": CaseModel,
+}
+
+# Prefixes for typed ids ("cpu:1"), named like the SavedBuild relationships
+TYPED_ID_PREFIXES = {
+    "cpu": "cpus",
+    "gpu": "gpus",
+    "motherboard": "motherboards",
+    "ram": "ram",
+    "storage": "storage",
+    "psu": "psus",
+    "cooler": "coolers",
+    "case": "cases",
+}
+
+# Range filters supported per component type, mapped to the column they apply to
+RANGE_FILTERS = {
+    "cpus": {"price": "price"},
+    "gpus": {"price": "price", "wattage": "recommended_wattage"},
+    "motherboards": {"price": "price"},
+    "ram": {"price": "price", "capacity": "capacity", "speed": "speed"},
+    "storage": {"price": "price", "capacity": "capacity", "speed": "read_speed"},
+    "psus": {"price": "price", "wattage": "wattage"},
+    "coolers": {"price": "price"},
+    "cases": {"price": "price"},
+}
+
+# Sort orders map to (column, descending). Every column here has a (column, id)
+# index so keyset pages are index range scans, in either direction; rows
+# without a value are read after the rest from the same index.
+SORT_ORDERS = {
+    "id": (None, False),
+    "price_asc": ("price", False),
+    "price_desc": ("price", True),
+    "name": ("name", False),
+}
+
+SortOrder = Literal["id", "price_asc", "price_desc", "name"]
+
+# The CPU list has always been returned most expensive first, 50 at a time
+DEFAULT_SORTS = {"cpus": "price_desc"}
+DEFAULT_PAGE_SIZES = {"cpus": 50}
+
+MAX_PAGE_SIZE = 500
+
+
+class CatalogParams:
+    """Query parameters shared by all catalog list endpoints."""
+
+    def __init__(
+        self,
+        limit: Annotated[Optional[int], Query(ge=1, le=MAX_PAGE_SIZE)] = None,
+        cursor: Optional[str] = None,
+        # Offset paging, kept for existing clients; cursors stay fast on deep pages
+        skip: Annotated[int, Query(ge=0)] = 0,
+        sort: Optional[SortOrder] = None,
+        search: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_wattage: Optional[float] = None,
+        max_wattage: Optional[float] = None,
+        min_capacity: Optional[float] = None,
+        max_capacity: Optional[float] = None,
+        min_speed: Optional[float] = None,
+        max_speed: Optional[float] = None,
+        cpu_id: Optional[int] = None,
+        motherboard_id: Optional[int] = None,
+        gpu_id: Optional[int] = None,
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.skip = skip
+        self.sort = sort
+        self.search = search.strip() if search and search.strip() else None
+        self.ranges = {
+            "price": (min_price, max_price),
+            "wattage": (min_wattage, max_wattage),
+            "capacity": (min_capacity, max_capacity),
+            "speed": (min_speed, max_speed),
+        }
+        # Components the listed parts must be compatible with (see core.compat)
+        self.compatible_with = {
+            "cpu_id": cpu_id,
+            "motherboard_id": motherboard_id,
+            "gpu_id": gpu_id,
+        }
+
+    def is_default(self) -> bool:
+        """True when the request asks for the full list in its default order."""
+        return (
+            self.limit is None
+            and self.cursor is None
+            and not self.skip
+            and self.sort is None
+            and self.search is None
+            and not self.active_ranges()
+            and not self.active_compatibility()
+        )
+
+    def active_ranges(self) -> dict:
+        """Return only the range filters the client actually set."""
+        return {
+            name: bounds for name, bounds in self.ranges.items()
+            if bounds[0] is not None or bounds[1] is not None
+        }
+
+    def active_compatibility(self) -> dict:
+        return {name: value for name, value in self.compatible_with.items() if value is not None}
+
+
+def encode_cursor(sort_key: str, value: Any, row_id: int) -> str:
+    payload = json.dumps([sort_key, value, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, sort_key: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if cursor_sort != sort_key or not isinstance(row_id, int):
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort order")
+
+    return value, row_id
+
+
+def apply_range_filters(query, component_type: str, ranges: dict):
+    """Apply min/max filters, rejecting filters the component type does not have."""
+    model = CATALOG_MODELS[component_type]
+    supported = RANGE_FILTERS[component_type]
+
+    for name, (low, high) in ranges.items():
+        if name not in supported:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Filter '{name}' is not supported for {component_type}"
+            )
+        column = getattr(model, supported[name])
+        if low is not None:
+            query = query.filter(column >= low)
+        if high is not None:
+            query = query.filter(column <= high)
+
+    return query
+
+
+def _fetch(query, offset: int, limit: Optional[int]) -> list:
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def _sorted_rows(query, model, column_name: str, descending: bool, cursor: Optional[tuple], skip: int, fetch: Optional[int]) -> list:
+    """
+    Rows in (column, id) order with rows lacking a value last, ordered by id.
+
+    The two parts are read separately, the valued rows as one range of the
+    (column, id) index (walked backwards for descending sorts) and then the
+    rows without a value as its IS NULL range, so neither needs a sort or a
+    predicate the index cannot answer. Columns declared NOT NULL skip the
+    second part.
+    """
+    sort_column = getattr(model, column_name)
+    nullable = model.__table__.c[column_name].nullable
+    last_value, last_id = cursor if cursor else (None, None)
+
+    rows = []
+    if not (cursor and last_value is None):
+        valued = query.filter(sort_column.isnot(None)) if nullable else query
+        if cursor:
+            if descending:
+                valued = valued.filter(tuple_(sort_column, model.id) < tuple_(last_value, last_id))
+            else:
+                valued = valued.filter(tuple_(sort_column, model.id) > tuple_(last_value, last_id))
+        if descending:
+            order = (sort_column.desc(), model.id.desc())
+        else:
+            order = (sort_column, model.id)
+        rows = _fetch(valued.order_by(*order), skip, fetch)
+        if not nullable or (fetch is not None and len(rows) >= fetch):
+            return rows
+        if skip:
+            # The offset ran past every valued row; carry the rest into the tail
+            skip = 0 if rows else skip - valued.count()
+
+    unvalued = query.filter(sort_column.is_(None))
+    if cursor and last_value is None:
+        unvalued = unvalued.filter(model.id < last_id if descending else model.id > last_id)
+    unvalued = unvalued.order_by(model.id.desc() if descending else model.id)
+    return rows + _fetch(unvalued, skip, fetch - len(rows) if fetch is not None else None)
+
+
+def query_components(
+    db: Session,
+    component_type: str,
+    params: CatalogParams,
+    ids: Optional[set[int]] = None
+) -> tuple[list, Optional[str]]:
+    """
+    List components of one type with filters and keyset pagination.
+
+    `ids`, when given, restricts the list to those rows (the compatibility
+    filters resolve to an id set). Returns the page of rows and the cursor for
+    the next page, or None when this is the last page (or no limit was requested).
+    """
+    model = CATALOG_MODELS[component_type]
+    query = apply_range_filters(db.query(model), component_type, params.active_ranges())
+    if ids is not None:
+        if not ids:
+            return [], None
+        query = query.filter(model.id.in_(ids))
+
+    sort_key = params.sort or DEFAULT_SORTS.get(component_type, "id")
+    column_name, descending = SORT_ORDERS[sort_key]
+
+    if params.cursor and params.skip:
+        raise HTTPException(status_code=400, detail="Use either cursor or skip, not both")
+
+    # One row past the page tells us whether there is a next one
+    fetch = params.limit + 1 if params.limit is not None else None
+    cursor = decode_cursor(params.cursor, sort_key) if params.cursor else None
+
+    if column_name is None:
+        if cursor:
+            query = query.filter(model.id > cursor[1])
+        rows = _fetch(query.order_by(model.id), params.skip, fetch)
+    else:
+        rows = _sorted_rows(query, model, column_name, descending, cursor, params.skip, fetch)
+
+    if params.limit is None or len(rows) <= params.limit:
+        return rows, None
+
+    rows = rows[:params.limit]
+    last = rows[-1]
+    last_value = getattr(last, column_name) if column_name else None
+    return rows, encode_cursor(sort_key, last_value, last.id)
@@ -0,0 +1,237 @@
+from sqlalchemy import event, update, insert
+from sqlalchemy.orm import Session
+from models import CatalogVersion
+from core.catalog import CATALOG_MODELS, CATALOG_SCHEMAS, CatalogParams, query_components
+from core.serialization import rows_to_dicts
+from datetime import datetime
+from itertools import chain
+from typing import Optional
+import threading
+import orjson
+import time
+
+# How long a worker trusts its last read of the catalog version before asking
+# the database again. Writes made through this process are picked up at once;
+# ingestion runs in other processes within this many seconds.
+VERSION_CHECK_INTERVAL = 5.0
+
+def make_etag(component_type: str, version: int) -> str:
+    return f'"{component_type}-v{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header (possibly a list, possibly weak) against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def cache_headers(etag: str) -> dict:
+    # no-cache lets browsers keep the body but makes them revalidate every time
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+class CatalogSnapshot:
+    """Full list of one component type as of a catalog version, with its serialized body."""
+
+    def __init__(self, component_type: str, version: int, rows: list[dict], body: bytes):
+        self.component_type = component_type
+        self.version = version
+        self.rows = rows
+        self.body = body
+        self.etag = make_etag(component_type, version)
+        self._by_id: Optional[dict[int, dict]] = None
+
+    @property
+    def by_id(self) -> dict[int, dict]:
+        if self._by_id is None:
+            self._by_id = {row["id"]: row for row in self.rows}
+        return self._by_id
+
+
+class CatalogCache:
+    """
+    Per-process cache of catalog snapshots keyed by the catalog version.
+
+    A snapshot is only rebuilt when the version stored in `catalog_version`
+    moves, so repeat requests are answered without touching the component tables.
+    """
+
+    def __init__(self, version_check_interval: float = VERSION_CHECK_INTERVAL):
+        self.version_check_interval = version_check_interval
+        self._lock = threading.Lock()
+        self._snapshots: dict[str, CatalogSnapshot] = {}
+        self._bundles: dict[tuple, tuple[bytes, str]] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    def version(self, db: Session) -> int:
+        now = time.monotonic()
+        if self._version is None or now - self._checked_at >= self.version_check_interval:
+            version = db.query(CatalogVersion.version).filter(CatalogVersion.id == 1).scalar()
+            with self._lock:
+                self._version = version or 0
+                self._checked_at = now
+        return self._version
+
+    def etag(self, db: Session, component_type: str) -> str:
+        return make_etag(component_type, self.version(db))
+
+    def snapshot(self, db: Session, component_type: str) -> CatalogSnapshot:
+        version = self.version(db)
+        snapshot = self._snapshots.get(component_type)
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        # Same rows, order and filtering as an unparameterised list request
+        rows, _ = query_components(db, component_type, CatalogParams())
+        items = rows_to_dicts(rows, CATALOG_SCHEMAS[component_type])
+        snapshot = CatalogSnapshot(component_type, version, items, orjson.dumps(items))
+
+        with self._lock:
+            current = self._snapshots.get(component_type)
+            if current is None or current.version <= version:
+                self._snapshots[component_type] = snapshot
+        return snapshot
+
+    def lookup(self, db: Session, component_type: str, ids: set[int]) -> dict[int, dict]:
+        """
+        Rows of one type by id. Served from the snapshot; ids the snapshot
+        does not hold cost one IN query.
+        """
+        snapshot = self.snapshot(db, component_type)
+        found = {row_id: snapshot.by_id[row_id] for row_id in ids if row_id in snapshot.by_id}
+        missing = ids - found.keys()
+        if missing:
+            model = CATALOG_MODELS[component_type]
+            rows = db.query(model).filter(model.id.in_(missing)).all()
+            for item in rows_to_dicts(rows, CATALOG_SCHEMAS[component_type]):
+                found[item["id"]] = item
+        return found
+
+    def bundle(self, db: Session, component_types: list[str], columnar: bool = False) -> tuple[bytes, str]:
+        """
+        Serialized body and ETag for several component types in one document.
+
+        In columnar form every type is encoded as one array per field rather
+        than one object per row, which drops the repeated keys from the payload.
+        """
+        version = self.version(db)
+        key = (version, tuple(component_types), columnar)
+        cached = self._bundles.get(key)
+        if cached is not None:
+            return cached
+
+        snapshots = [self.snapshot(db, component_type) for component_type in component_types]
+        if columnar:
+            components = b",".join(
+                orjson.dumps(snapshot.component_type) + b":" + _columnar_json(snapshot)
+                for snapshot in snapshots
+            )
+        else:
+            components = b",".join(
+                orjson.dumps(snapshot.component_type) + b":" + snapshot.body
+                for snapshot in snapshots
+            )
+        layout = "columnar" if columnar else "rows"
+        body = (
+            b'{"version":' + str(version).encode()
+            + b',"format":"' + layout.encode()
+            + b'","components":{' + components + b"}}"
+        )
+        etag = f'"catalog-v{version}-{layout}-{"+".join(component_types)}"'
+
+        with self._lock:
+            # Bundles from older versions can never be served again
+            self._bundles = {k: v for k, v in self._bundles.items() if k[0] == version}
+            self._bundles[key] = (body, etag)
+        return body, etag
+
+    def expire(self):
+        """Make the next request re-read the catalog version from the database."""
+        with self._lock:
+            self._version = None
+
+
+def _columnar_json(snapshot: CatalogSnapshot) -> bytes:
+    fields = list(CATALOG_SCHEMAS[snapshot.component_type].model_fields)
+    columns = {field: [row[field] for row in snapshot.rows] for field in fields}
+    return orjson.dumps({"count": len(snapshot.rows), "columns": columns})
+
+
+catalog_cache = CatalogCache()
+
+
+_change_listeners = []
+
+_TYPE_BY_CLASS = {model: component_type for component_type, model in CATALOG_MODELS.items()}
+
+
+def on_catalog_commit(listener):
+    """
+    Register `listener(changes, version)` to run after a transaction that wrote
+    to the catalog commits. `changes` is a list of (component_type, id, values)
+    where values is a dict of column values, or None for a deleted row, and
+    `version` is the catalog version that transaction produced.
+    """
+    _change_listeners.append(listener)
+    return listener
+
+
+def bump_catalog_version(connection) -> int:
+    """Increment the shared catalog version inside the caller's transaction."""
+    version = connection.execute(
+        update(CatalogVersion)
+        .where(CatalogVersion.id == 1)
+        .values(version=CatalogVersion.version + 1, updated_at=datetime.utcnow())
+        .returning(CatalogVersion.version)
+    ).scalar()
+    if version is None:
+        connection.execute(
+            insert(CatalogVersion).values(id=1, version=1, updated_at=datetime.utcnow())
+        )
+        version = 1
+    return version
+
+
+def _column_values(obj) -> dict:
+    return {attr.key: getattr(obj, attr.key) for attr in obj.__mapper__.column_attrs}
+
+
+@event.listens_for(Session, "after_flush")
+def _track_catalog_writes(session, flush_context):
+    changes = []
+    for obj in chain(session.new, session.dirty):
+        component_type = _TYPE_BY_CLASS.get(type(obj))
+        if component_type and (obj in session.new or session.is_modified(obj)):
+            changes.append((component_type, obj.id, _column_values(obj)))
+    for obj in session.deleted:
+        component_type = _TYPE_BY_CLASS.get(type(obj))
+        if component_type:
+            changes.append((component_type, obj.id, None))
+
+    if not changes:
+        return
+
+    session.info.setdefault("catalog_changes", []).extend(changes)
+    if "catalog_version" not in session.info:
+        session.info["catalog_version"] = bump_catalog_version(session.connection())
+
+
+@event.listens_for(Session, "after_commit")
+def _expire_after_catalog_commit(session):
+    changes = session.info.pop("catalog_changes", None)
+    version = session.info.pop("catalog_version", None)
+    if changes is None:
+        return
+
+    catalog_cache.expire()
+    for listener in _change_listeners:
+        listener(changes, version)
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_after_rollback(session):
+    session.info.pop("catalog_changes", None)
+    session.info.pop("catalog_version", None)
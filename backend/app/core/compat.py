@@ -0,0 +1,220 @@
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from core.catalog import CATALOG_MODELS, CatalogParams
+from core.catalog_cache import catalog_cache
+from bisect import bisect_left
+from typing import Optional
+import re
+import threading
+
+# Compatibility filters per component type: query parameter -> (component type
+# of the referenced part, rule). The rule names the index the filter uses.
+COMPAT_FILTERS = {
+    "cpus": {"motherboard_id": ("motherboards", "socket")},
+    "motherboards": {"cpu_id": ("cpus", "socket")},
+    "ram": {"motherboard_id": ("motherboards", "memory_type")},
+    "cases": {"motherboard_id": ("motherboards", "form_factor")},
+    "psus": {"gpu_id": ("gpus", "wattage")},
+}
+
+# Board sizes from smallest to largest. A case that takes one size also takes
+# every smaller one, same as formFactorCompatibility in the frontend.
+FORM_FACTORS = ("ITX", "MATX", "ATX", "EATX", "SSI-EEB")
+
+_SOCKET_NUMBER_RE = re.compile(r"\b(\d{3,4})\b")
+_MEMORY_RE = re.compile(r"ddr(\d)")
+
+
+def normalize_socket(value: Optional[str]) -> Optional[str]:
+    """
+    Canonical socket name. The scraped data spells the same socket several
+    ways ("Socket AM5"/"AM5", "Socket 1700 Raptor Lake-S"/"1700 Alder Lake").
+    """
+    if not value:
+        return None
+    socket = value.lower().replace("socket", "").strip()
+    for name in ("am4", "am5", "str5"):
+        if re.search(rf"\b{name}\b", socket):
+            return name.upper()
+    match = _SOCKET_NUMBER_RE.search(socket)
+    if match:
+        return f"LGA{match.group(1)}"
+    return None
+
+
+def normalize_memory_type(value: Optional[str]) -> Optional[str]:
+    """
+    "DDR5", "DDR4 SDRAM" -> "DDR5"/"DDR4"; laptop modules keep a SODIMM
+    prefix so they never match a desktop board.
+    """
+    if not value:
+        return None
+    memory = value.lower()
+    match = _MEMORY_RE.search(memory)
+    if not match:
+        return None
+    generation = f"DDR{match.group(1)}"
+    return f"SODIMM-{generation}" if "sodimm" in memory else generation
+
+
+def normalize_form_factor(value: Optional[str]) -> Optional[str]:
+    """Canonical size of a single form factor ("Utökad ATX", "Mini Mini ITX", ...)."""
+    if not value:
+        return None
+    form_factor = value.lower().strip()
+    if "eeb" in form_factor:
+        return "SSI-EEB"
+    if "utökad" in form_factor or "extended" in form_factor or "e-atx" in form_factor:
+        return "EATX"
+    if "itx" in form_factor:
+        return "ITX"
+    if "micro" in form_factor or "mini" in form_factor:
+        # Mini ATX boards are closer to Micro ATX than to ITX in size
+        return "MATX"
+    if "atx" in form_factor:
+        return "ATX"
+    return None
+
+
+def largest_form_factor(value: Optional[str]) -> Optional[int]:
+    """
+    Rank of the largest board a case takes. Cases list several sizes
+    ("ATX, Micro ATX, Mini Mini ITX" or "Utökad ATX/SSI EEB").
+    """
+    if not value:
+        return None
+    ranks = [
+        FORM_FACTORS.index(form_factor)
+        for part in re.split(r"[,/]", value)
+        if (form_factor := normalize_form_factor(part))
+    ]
+    return max(ranks) if ranks else None
+
+
+class CompatibilityIndex:
+    """
+    Lookup tables from normalized compatibility keys to component ids, for one
+    catalog version. A compatibility filter is a dict lookup (or a bisect for
+    wattage) instead of a scan with string matching over the whole table.
+    """
+
+    def __init__(self, version: int):
+        self.version = version
+        self.sockets: dict[str, dict[str, frozenset[int]]] = {}
+        self.memory_types: dict[str, frozenset[int]] = {}
+        # Case ids that fit a board of each size
+        self.cases_by_board: list[frozenset[int]] = []
+        self._psu_wattages: list[float] = []
+        self._psu_ids: list[int] = []
+
+    @classmethod
+    def build(cls, version: int, rows: dict[str, list[dict]]) -> "CompatibilityIndex":
+        index = cls(version)
+
+        for component_type in ("cpus", "motherboards"):
+            by_socket: dict[str, set[int]] = {}
+            for row in rows[component_type]:
+                socket = normalize_socket(row.get("socket"))
+                if socket:
+                    by_socket.setdefault(socket, set()).add(row["id"])
+            index.sockets[component_type] = {key: frozenset(ids) for key, ids in by_socket.items()}
+
+        by_memory: dict[str, set[int]] = {}
+        for row in rows["ram"]:
+            memory_type = normalize_memory_type(row.get("memory_type") or row.get("type"))
+            if memory_type:
+                by_memory.setdefault(memory_type, set()).add(row["id"])
+        index.memory_types = {key: frozenset(ids) for key, ids in by_memory.items()}
+
+        fits: list[set[int]] = [set() for _ in FORM_FACTORS]
+        for row in rows["cases"]:
+            largest = largest_form_factor(row.get("form_factor"))
+            if largest is not None:
+                for rank in range(largest + 1):
+                    fits[rank].add(row["id"])
+        index.cases_by_board = [frozenset(ids) for ids in fits]
+
+        psus = sorted(
+            (row["wattage"], row["id"]) for row in rows["psus"] if row.get("wattage") is not None
+        )
+        index._psu_wattages = [wattage for wattage, _ in psus]
+        index._psu_ids = [psu_id for _, psu_id in psus]
+
+        return index
+
+    def psus_with_wattage(self, minimum: float) -> frozenset[int]:
+        start = bisect_left(self._psu_wattages, minimum)
+        return frozenset(self._psu_ids[start:])
+
+    def compatible(self, component_type: str, rule: str, reference) -> Optional[frozenset[int]]:
+        """
+        Ids of `component_type` compatible with the referenced part, or None
+        when the reference does not say enough to rule anything out.
+        """
+        if rule == "socket":
+            socket = normalize_socket(reference.socket)
+            return self.sockets[component_type].get(socket, frozenset()) if socket else None
+        if rule == "memory_type":
+            memory_type = normalize_memory_type(reference.memory_type)
+            return self.memory_types.get(memory_type, frozenset()) if memory_type else None
+        if rule == "form_factor":
+            form_factor = normalize_form_factor(reference.form_factor)
+            if form_factor is None:
+                return None
+            return self.cases_by_board[FORM_FACTORS.index(form_factor)]
+        if rule == "wattage":
+            if reference.recommended_wattage is None:
+                return None
+            return self.psus_with_wattage(reference.recommended_wattage)
+        raise ValueError(f"Unknown compatibility rule: {rule}")
+
+
+_index: Optional[CompatibilityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_compatibility_index(db: Session) -> CompatibilityIndex:
+    """Compatibility index for the current catalog version, built from the cached snapshots."""
+    global _index
+    version = catalog_cache.version(db)
+    index = _index
+    if index is not None and index.version == version:
+        return index
+
+    rows = {
+        component_type: catalog_cache.snapshot(db, component_type).rows
+        for component_type in ("cpus", "motherboards", "ram", "cases", "psus")
+    }
+    index = CompatibilityIndex.build(version, rows)
+    with _index_lock:
+        _index = index
+    return index
+
+
+def compatible_ids(db: Session, component_type: str, params: CatalogParams) -> Optional[set[int]]:
+    """
+    Resolve the compatibility parameters of a list request to the set of ids
+    the list may contain, or None when the request has none.
+    """
+    requested = params.active_compatibility()
+    if not requested:
+        return None
+
+    supported = COMPAT_FILTERS.get(component_type, {})
+    ids = None
+    for name, reference_id in requested.items():
+        if name not in supported:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Filter '{name}' is not supported for {component_type}"
+            )
+        reference_type, rule = supported[name]
+        reference = db.get(CATALOG_MODELS[reference_type], reference_id)
+        if reference is None:
+            raise HTTPException(status_code=404, detail=f"No {reference_type} with id {reference_id}")
+
+        matches = get_compatibility_index(db).compatible(component_type, rule, reference)
+        if matches is not None:
+            ids = set(matches) if ids is None else ids & matches
+
+    return ids
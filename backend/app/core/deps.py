@@ -1,25 +1,28 @@
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
-from models import Token, User
+from core.auth_cache import AuthenticatedUser, resolve_token
 from api.endpoints.auth import oauth2_scheme
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+) -> AuthenticatedUser:
     """
     Get the current user from the token.
+    Served from the auth cache; a miss costs one joined Token/User query.
     """
-    db_token = db.query(Token).filter(Token.token == token).first()
-    if not db_token:
+    user = await resolve_token(db, token)
+    if not user:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, 
+            status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token"
         )
 
-    user = db.query(User).filter(User.id == db_token.user_id).first()
-    if not user:
+    if not user.is_active:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, 
-            detail="User not found"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User is deactivated"
         )
 
-    return user
\ No newline at end of file
+    return user
@@ -0,0 +1,192 @@
+from sqlalchemy.orm import Session
+from core.catalog_cache import catalog_cache, on_catalog_commit
+from typing import Optional
+import threading
+
+# Attributes the component browser can facet on, per component type
+FACET_FIELDS = {
+    "cpus": ("brand", "socket"),
+    "gpus": ("brand", "memory"),
+    "motherboards": ("brand", "socket", "form_factor", "chipset", "memory_type"),
+    "ram": ("brand", "memory_type", "type"),
+    "storage": ("type", "form_factor", "interface"),
+    "psus": ("brand", "efficiency"),
+    "coolers": ("brand", "type"),
+    "cases": ("brand", "form_factor", "color"),
+}
+
+PRICE_FACET = "price_range"
+
+# Same bands as ChromaDB.manager.get_price_range
+PRICE_BUCKETS = (
+    ("budget", 1000),
+    ("mid-range", 3000),
+    ("high-end", 6000),
+    ("premium", None),
+)
+
+
+def price_bucket(price: Optional[float]) -> Optional[str]:
+    if price is None:
+        return None
+    for label, upper in PRICE_BUCKETS:
+        if upper is None or price < upper:
+            return label
+
+
+class FacetIndex:
+    """
+    Value -> bitmap index over one component type.
+
+    Every row owns a bit position; each facet value keeps a Python int with
+    the bits of the rows that have it. Counts under a filter are popcounts of
+    bitmap intersections, so no request ever groups rows.
+    """
+
+    def __init__(self, fields: tuple[str, ...], version: int):
+        self.fields = fields + (PRICE_FACET,)
+        self.version = version
+        self._bitmaps: dict[str, dict[str, int]] = {field: {} for field in self.fields}
+        self._positions: dict[int, int] = {}
+        self._values: dict[int, dict[str, str]] = {}
+        self._free: list[int] = []
+        self._next_position = 0
+        self._all = 0
+
+    def copy(self) -> "FacetIndex":
+        clone = FacetIndex.__new__(FacetIndex)
+        clone.fields = self.fields
+        clone.version = self.version
+        clone._bitmaps = {field: dict(bitmaps) for field, bitmaps in self._bitmaps.items()}
+        clone._positions = dict(self._positions)
+        clone._values = dict(self._values)
+        clone._free = list(self._free)
+        clone._next_position = self._next_position
+        clone._all = self._all
+        return clone
+
+    def _facet_values(self, row: dict) -> dict[str, str]:
+        values = {
+            field: str(row[field]) for field in self.fields[:-1]
+            if row.get(field) not in (None, "")
+        }
+        bucket = price_bucket(row.get("price"))
+        if bucket:
+            values[PRICE_FACET] = bucket
+        return values
+
+    def upsert(self, row: dict):
+        self.remove(row["id"])
+
+        position = self._free.pop() if self._free else self._next_position
+        if position == self._next_position:
+            self._next_position += 1
+        bit = 1 << position
+
+        values = self._facet_values(row)
+        for field, value in values.items():
+            bitmaps = self._bitmaps[field]
+            bitmaps[value] = bitmaps.get(value, 0) | bit
+
+        self._positions[row["id"]] = position
+        self._values[row["id"]] = values
+        self._all |= bit
+
+    def remove(self, row_id: int):
+        position = self._positions.pop(row_id, None)
+        if position is None:
+            return
+
+        bit = 1 << position
+        for field, value in self._values.pop(row_id).items():
+            bitmaps = self._bitmaps[field]
+            remaining = bitmaps[value] & ~bit
+            if remaining:
+                bitmaps[value] = remaining
+            else:
+                del bitmaps[value]
+
+        self._all &= ~bit
+        self._free.append(position)
+
+    def _selection_mask(self, field: str, values: set[str]) -> int:
+        mask = 0
+        for value in values:
+            mask |= self._bitmaps[field].get(value, 0)
+        return mask
+
+    def counts(self, selected: dict[str, set[str]]) -> tuple[int, dict[str, dict[str, int]]]:
+        """
+        Matching row count and per-value counts under the selected filters.
+
+        Values within one facet are OR-ed and facets are AND-ed. Each facet's
+        own selection is left out of its counts so the UI can still offer the
+        alternatives next to a ticked value.
+        """
+        masks = {field: self._selection_mask(field, values) for field, values in selected.items()}
+
+        total = self._all
+        for mask in masks.values():
+            total &= mask
+
+        facets = {}
+        for field in self.fields:
+            others = self._all
+            for other_field, mask in masks.items():
+                if other_field != field:
+                    others &= mask
+            counts = {
+                value: (bitmap & others).bit_count()
+                for value, bitmap in self._bitmaps[field].items()
+            }
+            facets[field] = dict(sorted(
+                ((value, count) for value, count in counts.items() if count),
+                key=lambda item: (-item[1], item[0])
+            ))
+
+        return total.bit_count(), facets
+
+
+_indexes: dict[str, FacetIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_facet_index(db: Session, component_type: str) -> FacetIndex:
+    """Facet index for the current catalog version, built from the cached snapshot."""
+    version = catalog_cache.version(db)
+    index = _indexes.get(component_type)
+    if index is not None and index.version == version:
+        return index
+
+    snapshot = catalog_cache.snapshot(db, component_type)
+    index = FacetIndex(FACET_FIELDS[component_type], snapshot.version)
+    for row in snapshot.rows:
+        index.upsert(row)
+
+    with _indexes_lock:
+        _indexes[component_type] = index
+    return index
+
+
+@on_catalog_commit
+def _apply_catalog_changes(changes: list, version: int):
+    """
+    Carry indexes forward to the version a local write produced by applying
+    just the changed rows, instead of rebuilding them from a fresh snapshot.
+    Indexes that missed an intermediate version are left to rebuild.
+    """
+    with _indexes_lock:
+        for component_type, current in list(_indexes.items()):
+            if current.version != version - 1:
+                continue
+            # Requests may be reading the live index, so update a copy and swap
+            index = current.copy()
+            for changed_type, row_id, values in changes:
+                if changed_type != component_type:
+                    continue
+                if values is None:
+                    index.remove(row_id)
+                else:
+                    index.upsert(values)
+            index.version = version
+            _indexes[component_type] = index
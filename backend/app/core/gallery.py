@@ -0,0 +1,203 @@
+from fastapi import HTTPException, Query
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import PublishedBuild, SavedBuild
+from core.build_prices import BUILD_PRICE_COLUMNS
+from core.build_search import get_build_search_index, search_query, search_vector, uses_full_text_search
+from core.catalog import encode_cursor, decode_cursor
+from core.serialization import BUILD_COMPONENTS, published_build_summary_dict
+from datetime import datetime
+from typing import Optional, Literal, Annotated
+
+MAX_GALLERY_PAGE_SIZE = 100
+
+# Gallery sort orders map to (sort column, tie-breaker, descending). Each pair
+# has a composite index, so every page is an index range scan however deep
+# the cursor is.
+GALLERY_SORTS = {
+    "newest": (PublishedBuild.created_at, PublishedBuild.id, True),
+    "top_rated": (PublishedBuild.avg_rating, PublishedBuild.id, True),
+    "most_rated": (PublishedBuild.rating_count, PublishedBuild.id, True),
+    "cheapest": (SavedBuild.total_price, SavedBuild.id, False),
+}
+
+# Best text match first; only valid with a search query. Ranked by
+# ts_rank on Postgres and by tf-idf in memory elsewhere.
+RELEVANCE_SORT = "relevance"
+
+GallerySort = Literal["relevance", "newest", "top_rated", "most_rated", "cheapest"]
+
+# Gallery cards read the build's own columns plus each component's name,
+# joined in, so a page is one query no matter how many ratings a build has
+SUMMARY_COLUMNS = (
+    PublishedBuild.id,
+    PublishedBuild.build_id,
+    SavedBuild.name,
+    SavedBuild.purpose,
+    SavedBuild.total_price,
+    PublishedBuild.avg_rating,
+    PublishedBuild.rating_count,
+    PublishedBuild.created_at,
+    *(BUILD_PRICE_COLUMNS[f"{name}_id"].name.label(name) for name in BUILD_COMPONENTS),
+)
+
+
+class GalleryParams:
+    """Query parameters of the public build gallery."""
+
+    def __init__(
+        self,
+        limit: Annotated[int, Query(ge=1, le=MAX_GALLERY_PAGE_SIZE)] = 20,
+        cursor: Optional[str] = None,
+        q: Annotated[Optional[str], Query(max_length=200)] = None,
+        sort: Optional[GallerySort] = None,
+        include_total: bool = False,
+        purpose: Optional[str] = None,
+        cpu_id: Optional[int] = None,
+        gpu_id: Optional[int] = None,
+        case_id: Optional[int] = None,
+        ram_id: Optional[int] = None,
+        storage_id: Optional[int] = None,
+        cooler_id: Optional[int] = None,
+        psu_id: Optional[int] = None,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.q = q.strip() if q and q.strip() else None
+        # A search is ranked by relevance unless another order is asked for
+        self.sort = sort or (RELEVANCE_SORT if self.q else "newest")
+        if self.sort == RELEVANCE_SORT and not self.q:
+            raise HTTPException(status_code=400, detail="Sorting by relevance requires a search query")
+        self.include_total = include_total
+        self.purpose = purpose
+        self.components = {
+            "cpu_id": cpu_id,
+            "gpu_id": gpu_id,
+            "case_id": case_id,
+            "ram_id": ram_id,
+            "storage_id": storage_id,
+            "cooler_id": cooler_id,
+            "psu_id": psu_id,
+        }
+        self.min_price = min_price
+        self.max_price = max_price
+
+    def conditions(self) -> list:
+        conditions = []
+        if self.purpose:
+            conditions.append(SavedBuild.purpose == self.purpose)
+        for column, component_id in self.components.items():
+            if component_id:
+                conditions.append(getattr(SavedBuild, column) == component_id)
+        # Totals are stored on the build, so the price range is part of the query
+        if self.min_price is not None:
+            conditions.append(SavedBuild.total_price >= self.min_price)
+        if self.max_price is not None:
+            conditions.append(SavedBuild.total_price <= self.max_price)
+        return conditions
+
+
+def _cursor_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _sort_value(sort_key: str, value):
+    if sort_key == "newest" and value is not None:
+        try:
+            return datetime.fromisoformat(value)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    if sort_key == RELEVANCE_SORT and not isinstance(value, (int, float)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value
+
+
+def summary_query():
+    """SUMMARY_COLUMNS for published builds, components outer-joined by slot."""
+    query = select(*SUMMARY_COLUMNS).join(SavedBuild, SavedBuild.id == PublishedBuild.build_id)
+    for name in BUILD_COMPONENTS:
+        model = BUILD_PRICE_COLUMNS[f"{name}_id"]
+        query = query.outerjoin(model, model.id == getattr(SavedBuild, f"{name}_id"))
+    return query
+
+
+def _page(rows: list, limit: int, sort_key: str, cursor_of) -> dict:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort_key, *cursor_of(rows[-1]))
+    return {"builds": [published_build_summary_dict(row) for row in rows], "next_cursor": next_cursor}
+
+
+def _in_memory_relevance_page(rows: list, scores: dict[int, float], params: GalleryParams) -> dict:
+    # Every match passing the filters is already loaded; rank them in Python,
+    # in the same (score, id) descending keyset order the database would use
+    rows = sorted(rows, key=lambda row: (scores[row.id], row.id), reverse=True)
+    if params.cursor:
+        last_score, last_id = decode_cursor(params.cursor, RELEVANCE_SORT)
+        last_score = _sort_value(RELEVANCE_SORT, last_score)
+        rows = [row for row in rows if (scores[row.id], row.id) < (last_score, last_id)]
+    return _page(rows[:params.limit + 1], params.limit, RELEVANCE_SORT, lambda row: (scores[row.id], row.id))
+
+
+async def query_published_builds(db: AsyncSession, params: GalleryParams) -> dict:
+    """
+    One page of gallery cards in the requested sort order, with the cursor for
+    the next page (None on the last page). The total is only counted when
+    asked for, since it costs a scan of every matching build. A search query
+    narrows the builds to those matching every word in their name, purpose or
+    component names.
+    """
+    conditions = params.conditions()
+    rank = scores = None
+    if params.q:
+        if uses_full_text_search(db):
+            tsquery = search_query(params.q)
+            conditions.append(search_vector().op("@@")(tsquery))
+            rank = func.ts_rank(search_vector(), tsquery)
+        else:
+            scores = (await get_build_search_index(db)).search(params.q)
+            if not scores:
+                return {"builds": [], "total": 0 if params.include_total else None, "next_cursor": None}
+            conditions.append(PublishedBuild.id.in_(scores))
+
+    total = None
+    if params.include_total:
+        total = await db.scalar(
+            select(func.count()).select_from(PublishedBuild).join(SavedBuild).where(*conditions)
+        )
+
+    if params.sort == RELEVANCE_SORT:
+        if scores is not None:
+            rows = (await db.execute(summary_query().where(*conditions))).all()
+            return {**_in_memory_relevance_page(rows, scores, params), "total": total}
+        sort_column, tie_column, descending = rank, PublishedBuild.id, True
+        query = summary_query().add_columns(rank.label("rank")).where(*conditions)
+        value_of = lambda row: row.rank
+    else:
+        sort_column, tie_column, descending = GALLERY_SORTS[params.sort]
+        # Rows without a value for the sort column cannot be placed on a keyset page
+        query = summary_query().where(*conditions, sort_column.isnot(None))
+        value_of = lambda row: _cursor_value(getattr(row, sort_column.key))
+
+    if params.cursor:
+        last_value, last_id = decode_cursor(params.cursor, params.sort)
+        last_value = _sort_value(params.sort, last_value)
+        if descending:
+            query = query.where(tuple_(sort_column, tie_column) < tuple_(last_value, last_id))
+        else:
+            query = query.where(tuple_(sort_column, tie_column) > tuple_(last_value, last_id))
+
+    if descending:
+        query = query.order_by(sort_column.desc(), tie_column.desc())
+    else:
+        query = query.order_by(sort_column, tie_column)
+
+    rows = (await db.execute(query.limit(params.limit + 1))).all()
+    page = _page(
+        rows, params.limit, params.sort,
+        lambda row: (value_of(row), row.build_id if tie_column is SavedBuild.id else row.id)
+    )
+    return {**page, "total": total}
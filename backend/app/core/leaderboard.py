@@ -0,0 +1,262 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import AsyncSessionLocal
+from models import PublishedBuild, SavedBuild, BuildRating
+from core.gallery import summary_query
+from core.ratings import RatingTotals
+from core.serialization import published_build_summary_dict
+from bisect import bisect_left, insort
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional, Literal
+import asyncio
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+# Longest list served per board
+LEADERBOARD_SIZE = 20
+
+# Bayesian average: every build starts with this many phantom votes at the
+# site-wide mean, so one 5-star vote does not outrank fifty 4.8s
+BAYES_PRIOR_VOTES = 5
+DEFAULT_PRIOR_MEAN = 3.0
+
+# Trending is vote activity with exponential decay: a vote's weight halves
+# every TRENDING_HALF_LIFE. Votes older than TRENDING_WINDOW are ignored on
+# rebuild, having decayed to under 1% of a fresh one.
+TRENDING_HALF_LIFE = 3 * 24 * 3600.0
+TRENDING_WINDOW = 7 * TRENDING_HALF_LIFE
+
+# Each worker keeps its own leaderboard, updated in place by the ratings and
+# publishes it handles, and rebuilt from the database this often to pick up
+# everything other workers did and to refresh the site-wide mean
+LEADERBOARD_SYNC_INTERVAL = 60.0
+
+# How long a request waits for the first rebuild after startup
+LEADERBOARD_READY_TIMEOUT = 5.0
+
+Board = Literal["top", "trending"]
+
+
+def _timestamp(value: Optional[datetime]) -> float:
+    # Timestamp columns hold naive UTC
+    return value.replace(tzinfo=timezone.utc).timestamp() if value else time.time()
+
+
+class _Ranking:
+    """Build ids by descending score, newest build first on ties."""
+
+    def __init__(self):
+        self._entries: list[tuple[float, int]] = []
+        self._keys: dict[int, tuple[float, int]] = {}
+
+    def set(self, build_id: int, score: float):
+        old = self._keys.get(build_id)
+        if old is not None:
+            del self._entries[bisect_left(self._entries, old)]
+        key = (-score, -build_id)
+        insort(self._entries, key)
+        self._keys[build_id] = key
+
+    def score(self, build_id: int) -> float:
+        return -self._keys[build_id][0]
+
+    def top(self, n: int) -> list[int]:
+        return [-build_id for _, build_id in self._entries[:n]]
+
+
+class _State:
+    """
+    Scores for every published build, and cards only for builds currently
+    on some board. Replaced wholesale by each rebuild.
+    """
+
+    def __init__(self, prior_mean: float, landmark: float, decay: float, prior_votes: int):
+        self.prior_mean = prior_mean
+        # Forward decay: weights grow as exp(decay * (t - landmark)) instead of
+        # old scores shrinking, so a vote never reorders other builds and the
+        # ranking stays valid as time passes
+        self.landmark = landmark
+        self.decay = decay
+        self.prior_votes = prior_votes
+        self.purposes: dict[int, Optional[str]] = {}
+        self.trend: dict[int, float] = {}
+        self.cards: dict[int, dict] = {}
+        self.top = _Ranking()
+        self.trending = _Ranking()
+        self.by_purpose: dict[str, _Ranking] = defaultdict(_Ranking)
+
+    def add_build(self, build_id: int, purpose: Optional[str]):
+        self.purposes[build_id] = purpose
+        self.set_totals(build_id, 0.0, 0)
+
+    def bayesian_score(self, rating_sum: float, rating_count: int) -> float:
+        return (self.prior_votes * self.prior_mean + rating_sum) / (self.prior_votes + rating_count)
+
+    def set_totals(self, build_id: int, rating_sum: float, rating_count: int):
+        score = self.bayesian_score(rating_sum or 0.0, rating_count or 0)
+        self.top.set(build_id, score)
+        purpose = self.purposes.get(build_id)
+        if purpose:
+            self.by_purpose[purpose].set(build_id, score)
+
+    def add_activity(self, build_id: int, weight: float, at: float):
+        self.trend[build_id] = self.trend.get(build_id, 0.0) + weight * math.exp(self.decay * (at - self.landmark))
+        self.trending.set(build_id, self.trend[build_id])
+
+    def trending_score(self, build_id: int, now: float) -> float:
+        """Decayed activity as of now, in units of fresh 5-star votes"""
+        return self.trending.score(build_id) * math.exp(-self.decay * (now - self.landmark))
+
+    def ranking(self, board: Board, purpose: Optional[str]) -> Optional[_Ranking]:
+        if board == "trending":
+            return self.trending
+        if purpose:
+            return self.by_purpose.get(purpose)
+        return self.top
+
+    def listed_ids(self, size: int) -> set[int]:
+        ids = set(self.top.top(size)) | set(self.trending.top(size))
+        for ranking in self.by_purpose.values():
+            ids.update(ranking.top(size))
+        return ids
+
+
+class Leaderboard:
+    """
+    Ranked published builds for the home page: overall and per-purpose top
+    lists by Bayesian-weighted rating, and a trending list by decayed recent
+    votes. Reads never touch the database.
+    """
+
+    def __init__(
+        self,
+        size: int = LEADERBOARD_SIZE,
+        prior_votes: int = BAYES_PRIOR_VOTES,
+        half_life: float = TRENDING_HALF_LIFE
+    ):
+        self.size = size
+        self.prior_votes = prior_votes
+        self.decay = math.log(2) / half_life
+        self._state = _State(DEFAULT_PRIOR_MEAN, time.time(), self.decay, prior_votes)
+        self._ready = asyncio.Event()
+
+    async def wait_ready(self, timeout: float = LEADERBOARD_READY_TIMEOUT) -> bool:
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def ranked(self, board: Board, limit: int, purpose: Optional[str] = None) -> list[dict]:
+        state = self._state
+        ranking = state.ranking(board, purpose)
+        if ranking is None:
+            return []
+        now = time.time()
+        entries = []
+        for build_id in ranking.top(min(limit, self.size)):
+            card = state.cards.get(build_id)
+            if card is None:
+                continue
+            score = state.trending_score(build_id, now) if board == "trending" else ranking.score(build_id)
+            entries.append({**card, "score": round(score, 4)})
+        return entries
+
+    async def rebuild(self, db: AsyncSession):
+        """Recompute every score from the database and swap the result in."""
+        now = time.time()
+        totals = (await db.execute(
+            select(
+                PublishedBuild.id,
+                SavedBuild.purpose,
+                PublishedBuild.rating_sum,
+                PublishedBuild.rating_count,
+                PublishedBuild.created_at,
+            ).join(SavedBuild, SavedBuild.id == PublishedBuild.build_id)
+        )).all()
+        cutoff = datetime.fromtimestamp(now - TRENDING_WINDOW, timezone.utc).replace(tzinfo=None)
+        votes = (await db.execute(
+            select(BuildRating.published_build_id, BuildRating.rating, BuildRating.created_at)
+            .where(BuildRating.created_at >= cutoff)
+        )).all()
+
+        vote_sum = sum(row.rating_sum or 0.0 for row in totals)
+        vote_count = sum(row.rating_count or 0 for row in totals)
+        prior_mean = vote_sum / vote_count if vote_count else DEFAULT_PRIOR_MEAN
+        state = _State(prior_mean, now, self.decay, self.prior_votes)
+        for build_id, purpose, rating_sum, rating_count, created_at in totals:
+            state.purposes[build_id] = purpose
+            state.set_totals(build_id, rating_sum, rating_count)
+            # A fresh publish counts as one top vote, so new builds can trend
+            if now - _timestamp(created_at) < TRENDING_WINDOW:
+                state.add_activity(build_id, 1.0, _timestamp(created_at))
+        for build_id, rating, created_at in votes:
+            if build_id in state.purposes:
+                state.add_activity(build_id, rating / 5, _timestamp(created_at))
+
+        await self._fill_cards(db, state)
+        self._state = state
+        self._ready.set()
+
+    async def _fill_cards(self, db: AsyncSession, state: _State):
+        listed = state.listed_ids(self.size)
+        missing = listed - state.cards.keys()
+        if missing:
+            rows = (await db.execute(summary_query().where(PublishedBuild.id.in_(missing)))).all()
+            for row in rows:
+                state.cards[row.id] = published_build_summary_dict(row)
+        for build_id in state.cards.keys() - listed:
+            del state.cards[build_id]
+
+    async def _ensure_known(self, db: AsyncSession, state: _State, published_build_ids: list[int]):
+        # Published through another worker since the last rebuild
+        unknown = [build_id for build_id in published_build_ids if build_id not in state.purposes]
+        if unknown:
+            rows = (await db.execute(
+                select(PublishedBuild.id, SavedBuild.purpose)
+                .join(SavedBuild, SavedBuild.id == PublishedBuild.build_id)
+                .where(PublishedBuild.id.in_(unknown))
+            )).all()
+            for build_id, purpose in rows:
+                state.add_build(build_id, purpose)
+
+    async def record_publish(self, db: AsyncSession, *published_build_ids: int):
+        state = self._state
+        await self._ensure_known(db, state, list(published_build_ids))
+        now = time.time()
+        for build_id in published_build_ids:
+            if build_id in state.purposes:
+                state.add_activity(build_id, 1.0, now)
+        await self._fill_cards(db, state)
+
+    async def record_rating(self, db: AsyncSession, totals: RatingTotals, rating: float):
+        """Apply a committed vote; `totals` are the build's aggregates after it."""
+        state = self._state
+        build_id = totals.published_build_id
+        await self._ensure_known(db, state, [build_id])
+        state.set_totals(build_id, totals.rating_sum, totals.rating_count)
+        state.add_activity(build_id, rating / 5, time.time())
+
+        card = state.cards.get(build_id)
+        if card is not None:
+            card["avg_rating"] = totals.avg_rating
+            card["rating_count"] = totals.rating_count
+        await self._fill_cards(db, state)
+
+
+leaderboard = Leaderboard()
+
+
+async def run_leaderboard_sync(interval: float = LEADERBOARD_SYNC_INTERVAL):
+    """Background loop started from the app lifespan; cancelled on shutdown."""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await leaderboard.rebuild(db)
+        except Exception as e:
+            logger.error(f"Leaderboard rebuild failed: {str(e)}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,172 @@
+from sqlalchemy import case, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from limits.storage import Storage
+from models import RateLimitCounter
+from core.settings import settings
+from typing import Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# How often a worker pushes its increments to the shared table and pulls
+# back the totals of every other worker. Between flushes each worker can let
+# through at most what it sees locally, so across N workers a limit can be
+# overshot by at most (N - 1) x the requests one worker takes per interval.
+FLUSH_INTERVAL = 0.5
+
+# Rows are kept this long past their window so slow flushes still find them
+EXPIRED_ROW_GRACE = 60.0
+
+
+class _Window:
+    __slots__ = ("shared", "pending", "expires_at")
+
+    def __init__(self, expires_at: float):
+        self.shared = 0
+        self.pending = 0
+        self.expires_at = expires_at
+
+
+class SQLCounterStorage(Storage):
+    """
+    Fixed-window rate limit counters shared through the database.
+
+    slowapi calls storage synchronously from the request path, so increments
+    never touch the database there. They are applied to a local window, and a
+    background thread flushes the accumulated deltas for all keys in one
+    transaction every FLUSH_INTERVAL, receiving the combined count from every
+    worker in return. Windows are aligned to whichever worker opened the
+    row first.
+
+    Select it with RATE_LIMIT_STORAGE_URI=sql:// (uses DB_URL).
+    """
+
+    STORAGE_SCHEME = ["sql"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.flush_interval = float(options.get("flush_interval", FLUSH_INTERVAL))
+        self._windows: dict[str, _Window] = {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    @property
+    def base_exceptions(self):
+        return SQLAlchemyError
+
+    def _engine(self):
+        # Imported late so the storage can be configured before the engine exists
+        from database import engine
+        return engine
+
+    def _ensure_flusher(self):
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="rate-limit-flush", daemon=True)
+            self._flusher.start()
+
+    def _window(self, key: str, now: float) -> Optional[_Window]:
+        window = self._windows.get(key)
+        if window is not None and window.expires_at <= now:
+            del self._windows[key]
+            return None
+        return window
+
+    def incr(self, key: str, expiry: int, amount: int = 1, elastic_expiry: bool = False) -> int:
+        now = time.time()
+        with self._lock:
+            self._ensure_flusher()
+            window = self._window(key, now)
+            if window is None:
+                window = self._windows[key] = _Window(now + expiry)
+            window.pending += amount
+            return window.shared + window.pending
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            window = self._window(key, time.time())
+            return window.shared + window.pending if window else 0
+
+    def get_expiry(self, key: str) -> float:
+        with self._lock:
+            window = self._window(key, time.time())
+            return window.expires_at if window else time.time()
+
+    def check(self) -> bool:
+        try:
+            with self._engine().connect():
+                return True
+        except SQLAlchemyError:
+            return False
+
+    def reset(self) -> Optional[int]:
+        with self._lock:
+            cleared = len(self._windows)
+            self._windows.clear()
+        with self._engine().begin() as connection:
+            connection.execute(delete(RateLimitCounter))
+        return cleared
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._windows.pop(key, None)
+        with self._engine().begin() as connection:
+            connection.execute(delete(RateLimitCounter).where(RateLimitCounter.key == key))
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Rate limit flush failed: {str(e)}")
+
+    def flush(self):
+        """Push pending increments and pull back the shared totals, in one transaction."""
+        now = time.time()
+        with self._lock:
+            batch = {
+                key: (window, window.pending, window.expires_at)
+                for key, window in self._windows.items()
+                if window.pending and window.expires_at > now
+            }
+        if not batch:
+            return
+
+        engine = self._engine()
+        insert = postgresql.insert if engine.dialect.name == "postgresql" else sqlite.insert
+        results = {}
+        with engine.begin() as connection:
+            for key, (_, pending, expires_at) in batch.items():
+                stmt = insert(RateLimitCounter).values(key=key, count=pending, expires_at=expires_at)
+                live = RateLimitCounter.expires_at > now
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[RateLimitCounter.key],
+                    set_={
+                        "count": case((live, RateLimitCounter.count + stmt.excluded.count), else_=stmt.excluded.count),
+                        "expires_at": case((live, RateLimitCounter.expires_at), else_=stmt.excluded.expires_at),
+                    }
+                ).returning(RateLimitCounter.count, RateLimitCounter.expires_at)
+                results[key] = connection.execute(stmt).one()
+            connection.execute(
+                delete(RateLimitCounter).where(RateLimitCounter.expires_at < now - EXPIRED_ROW_GRACE)
+            )
+
+        with self._lock:
+            for key, (window, pending, _) in batch.items():
+                if self._windows.get(key) is not window:
+                    # The window expired and was reopened while we flushed
+                    continue
+                count, expires_at = results[key]
+                window.pending -= pending
+                window.shared = count
+                window.expires_at = expires_at
+
+
+# One limiter for the whole app; main.py installs it on app.state and the
+# endpoint modules decorate their routes with it
+limiter = Limiter(key_func=get_remote_address, storage_uri=settings.RATE_LIMIT_STORAGE_URI)
@@ -0,0 +1,89 @@
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import BuildRating, PublishedBuild
+from typing import Optional
+
+# A first vote racing another first vote from the same user loses on the
+# unique constraint; the retry then finds the winner's row and updates it
+RATE_ATTEMPTS = 2
+
+
+class RatingTotals:
+    __slots__ = ("published_build_id", "rating_sum", "rating_count", "avg_rating")
+
+    def __init__(self, published_build_id: int, rating_sum: float, rating_count: int, avg_rating: float):
+        self.published_build_id = published_build_id
+        self.rating_sum = rating_sum
+        self.rating_count = rating_count
+        self.avg_rating = avg_rating
+
+
+async def _write_rating(
+    db: AsyncSession,
+    published_build_id: int,
+    user_id: int,
+    rating: float,
+    comment: Optional[str]
+) -> tuple[BuildRating, RatingTotals]:
+    # Locks only this user's own rating row, so a re-vote reads the value the
+    # previous vote committed; other users' votes never wait on it
+    existing = await db.scalar(
+        select(BuildRating)
+        .where(BuildRating.published_build_id == published_build_id, BuildRating.user_id == user_id)
+        .with_for_update()
+    )
+    if existing:
+        delta, added = rating - existing.rating, 0
+        existing.rating = rating
+        existing.comment = comment
+        saved = existing
+    else:
+        delta, added = rating, 1
+        saved = BuildRating(
+            published_build_id=published_build_id,
+            user_id=user_id,
+            rating=rating,
+            comment=comment
+        )
+        db.add(saved)
+    await db.flush()
+
+    # Applied by the database as increments, so concurrent votes cannot
+    # overwrite each other. The right-hand side reads the pre-update row.
+    row = (await db.execute(
+        update(PublishedBuild)
+        .where(PublishedBuild.id == published_build_id)
+        .values(
+            rating_sum=PublishedBuild.rating_sum + delta,
+            rating_count=PublishedBuild.rating_count + added,
+            avg_rating=(PublishedBuild.rating_sum + delta) / (PublishedBuild.rating_count + added),
+        )
+        .returning(PublishedBuild.rating_sum, PublishedBuild.rating_count, PublishedBuild.avg_rating)
+        .execution_options(synchronize_session=False)
+    )).one()
+    return saved, RatingTotals(published_build_id, *row)
+
+
+async def apply_rating(
+    db: AsyncSession,
+    published_build_id: int,
+    user_id: int,
+    rating: float,
+    comment: Optional[str]
+) -> tuple[BuildRating, RatingTotals]:
+    """
+    Create or replace a user's rating of a published build and fold it into
+    the build's rating_sum/rating_count, committing both. The build's row is
+    locked only by the final UPDATE, for the rest of a short transaction.
+    The caller checks that the published build exists.
+    """
+    for attempt in range(RATE_ATTEMPTS):
+        try:
+            saved, totals = await _write_rating(db, published_build_id, user_id, rating, comment)
+            await db.commit()
+            return saved, totals
+        except IntegrityError:
+            await db.rollback()
+            if attempt == RATE_ATTEMPTS - 1:
+                raise
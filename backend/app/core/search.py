@@ -0,0 +1,182 @@
+from fastapi import HTTPException
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from core.catalog import CATALOG_MODELS, CatalogParams, apply_range_filters
+from core.catalog_cache import catalog_cache
+from collections import defaultdict
+from typing import Iterable, Optional
+import re
+import threading
+
+# Same default cut-off as pg_trgm's `%` operator (pg_trgm.similarity_threshold)
+SIMILARITY_THRESHOLD = 0.3
+
+# Page size for search requests that do not set a limit
+DEFAULT_SEARCH_LIMIT = 50
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+# Columns a search matches, per component type. Each one has a trigram index
+# on Postgres (migrations 6d713da4567d and 9b2f4e7a1c86).
+SEARCH_COLUMNS = {"cpus": ("name", "socket")}
+
+
+def words(text: str) -> list[str]:
+    """Lower-cased alphanumeric words of a string, as pg_trgm splits them."""
+    return _WORD_RE.findall(text.lower())
+
+
+def trigrams(text: str) -> set[str]:
+    """
+    Trigrams of a string the way pg_trgm builds them: lower-cased, split into
+    alphanumeric words, each padded with two leading and one trailing space.
+    """
+    grams = set()
+    for word in words(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NgramIndex:
+    """
+    In-memory trigram inverted index over component names.
+
+    Used where pg_trgm is not available (SQLite deployments and tests). Ranking
+    mirrors pg_trgm's similarity() so both backends order results the same way.
+    """
+
+    def __init__(self, documents: Iterable[tuple[int, str]]):
+        self._names: dict[int, str] = {}
+        self._grams: dict[int, set[str]] = {}
+        self._postings: dict[str, set[int]] = defaultdict(set)
+
+        for doc_id, name in documents:
+            name = name or ""
+            grams = trigrams(name)
+            self._names[doc_id] = name.lower()
+            self._grams[doc_id] = grams
+            for gram in grams:
+                self._postings[gram].add(doc_id)
+
+    def search(self, query: str, threshold: float = SIMILARITY_THRESHOLD) -> list[tuple[int, float]]:
+        """Return (id, similarity) for substring or fuzzy matches, best first."""
+        needle = query.lower()
+        query_grams = trigrams(query)
+
+        shared: dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for doc_id in self._postings.get(gram, ()):
+                shared[doc_id] += 1
+
+        results = []
+        # Every substring match shares at least one trigram with the query,
+        # except for queries too short to produce any
+        candidates = shared.keys() if query_grams else self._names.keys()
+        for doc_id in candidates:
+            overlap = shared.get(doc_id, 0)
+            union = len(query_grams) + len(self._grams[doc_id]) - overlap
+            similarity = overlap / union if union else 0.0
+            if similarity >= threshold or needle in self._names[doc_id]:
+                results.append((doc_id, similarity))
+
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results
+
+
+def search_columns(component_type: str) -> tuple[str, ...]:
+    return SEARCH_COLUMNS.get(component_type, ("name",))
+
+
+_indexes: dict[tuple[str, str], tuple[int, NgramIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_ngram_index(db: Session, component_type: str, column: str = "name") -> NgramIndex:
+    """Trigram index over one column of a component type, rebuilt when the catalog version moves."""
+    snapshot = catalog_cache.snapshot(db, component_type)
+    cached = _indexes.get((component_type, column))
+    if cached is not None and cached[0] == snapshot.version:
+        return cached[1]
+
+    index = NgramIndex((row["id"], row[column]) for row in snapshot.rows)
+    with _indexes_lock:
+        _indexes[(component_type, column)] = (snapshot.version, index)
+    return index
+
+
+def uses_trigram_index(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def trigram_filter(model, search: str, columns: tuple[str, ...] = ("name",)):
+    """
+    Match on any of `columns`, each served by its GIN (lower(column) gin_trgm_ops)
+    index: a substring LIKE (which pg_trgm can answer from the index) or a
+    fuzzy `%` match.
+    """
+    needle = search.lower()
+    matches = []
+    for column in columns:
+        value = func.lower(getattr(model, column))
+        matches += [value.contains(needle, autoescape=True), value.op("%")(needle)]
+    return or_(*matches)
+
+
+def trigram_rank(model, search: str, columns: tuple[str, ...] = ("name",)):
+    """Best similarity over `columns`; a missing value counts as no match."""
+    ranks = [func.coalesce(func.similarity(func.lower(getattr(model, column)), search.lower()), 0) for column in columns]
+    return ranks[0] if len(ranks) == 1 else func.greatest(*ranks)
+
+
+def search_components(
+    db: Session,
+    component_type: str,
+    params: CatalogParams,
+    ids: Optional[set[int]] = None
+) -> list:
+    """
+    Name search for one component type (plus the other SEARCH_COLUMNS, such as
+    a CPU's socket), ranked by trigram similarity.
+
+    Range filters and an `ids` restriction still apply; the sort order does
+    not, since results come back best match first. Uses the pg_trgm index on Postgres and the in-memory
+    trigram index everywhere else.
+    """
+    if params.cursor:
+        raise HTTPException(
+            status_code=400,
+            detail="Search results are ranked and cannot be paged with a cursor"
+        )
+
+    model = CATALOG_MODELS[component_type]
+    limit = params.limit or DEFAULT_SEARCH_LIMIT
+    query = apply_range_filters(db.query(model), component_type, params.active_ranges())
+    if ids is not None:
+        if not ids:
+            return []
+        query = query.filter(model.id.in_(ids))
+
+    columns = search_columns(component_type)
+    if uses_trigram_index(db):
+        return (
+            query.filter(trigram_filter(model, params.search, columns))
+            .order_by(trigram_rank(model, params.search, columns).desc(), model.id)
+            .offset(params.skip)
+            .limit(limit)
+            .all()
+        )
+
+    # Best similarity per id over all searched columns
+    scores: dict[int, float] = {}
+    for column in columns:
+        for doc_id, similarity in get_ngram_index(db, component_type, column).search(params.search):
+            scores[doc_id] = max(similarity, scores.get(doc_id, 0.0))
+    ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+    positions = {doc_id: position for position, doc_id in enumerate(ranked)}
+    if not positions:
+        return []
+
+    rows = query.filter(model.id.in_(positions)).all()
+    rows.sort(key=lambda row: positions[row.id])
+    return rows[params.skip:params.skip + limit]
@@ -1,7 +1,22 @@
 from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
+from core.settings import settings
+import asyncio
+import logging
+import threading
+import time
 import re
 
 
+logger = logging.getLogger(__name__)
+
+# Rejections during a login storm are logged with the pool's stats at most
+# this often
+BUSY_LOG_INTERVAL = 10.0
+
+# How often each worker logs the pool's stats while it is in use
+POOL_STATS_LOG_INTERVAL = 60.0
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -12,6 +27,106 @@ def get_password_hash(password: str) -> str:
     
     return pwd_context.hash(password)
 
+class PasswordPoolBusy(Exception):
+    """Raised when the password hashing queue is full"""
+
+
+class PasswordHashPool:
+    """
+    Runs bcrypt on a small dedicated thread pool instead of the event loop.
+
+    bcrypt releases the GIL while it works, so hashing proceeds in parallel
+    with request handling. At most `workers + queue_limit` calls are admitted
+    at once; beyond that callers get PasswordPoolBusy straight away instead
+    of queueing behind a login storm.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+        self._busy_logged_at = None
+
+    async def run(self, fn, *args):
+        with self._lock:
+            busy = self._pending >= self.workers + self.queue_limit
+            if busy:
+                self.rejected += 1
+                now = time.monotonic()
+                log_busy = self._busy_logged_at is None or now - self._busy_logged_at >= BUSY_LOG_INTERVAL
+                if log_busy:
+                    self._busy_logged_at = now
+            else:
+                self._pending += 1
+        if busy:
+            if log_busy:
+                logger.warning(f"Password hashing pool full, rejecting: {self.stats()}")
+            raise PasswordPoolBusy()
+
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self.total_wait += started - submitted
+                    self.total_run += finished - started
+                    self.completed += 1
+
+        def release(_):
+            with self._lock:
+                self._pending -= 1
+
+        # Released when the job leaves the executor (run, or cancelled before
+        # it started), not when the caller stops waiting: a disconnected
+        # client's job still holds its queue slot until then
+        job = self._executor.submit(timed)
+        job.add_done_callback(release)
+        return await asyncio.wrap_future(job)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": min(self._pending, self.workers),
+                "queued": max(self._pending - self.workers, 0),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(1000 * self.total_wait / self.completed, 2) if self.completed else 0.0,
+                "avg_run_ms": round(1000 * self.total_run / self.completed, 2) if self.completed else 0.0,
+            }
+
+
+password_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE_LIMIT)
+
+async def run_pool_stats_logger(interval: float = POOL_STATS_LOG_INTERVAL):
+    """Background loop started from the app lifespan; cancelled on shutdown."""
+    last = (0, 0, 0, 0)
+    while True:
+        await asyncio.sleep(interval)
+        stats = password_pool.stats()
+        activity = (stats["completed"], stats["rejected"], stats["in_flight"], stats["queued"])
+        # Nothing to report for a worker that has not hashed since the last line
+        if activity != last:
+            logger.info(f"Password hashing pool: {stats}")
+            last = activity
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_pool.run(get_password_hash, password)
+
 def validate_password_strength(password: str) -> dict:
     """
     Validate password strength according to security best practices.
@@ -0,0 +1,80 @@
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from schemas import SavedBuildOut, BuildRatingOut, PublishedBuildOut, PublishedBuildSummary
+from typing import Iterable, Optional
+import orjson
+
+# Component relationships on SavedBuild, in the order SavedBuildOut declares them
+BUILD_COMPONENTS = ("cpu", "gpu", "motherboard", "ram", "psu", "case", "storage", "cooler")
+
+_COMPONENT_FIELDS = {
+    name: tuple(SavedBuildOut.model_fields[name].annotation.__args__[0].model_fields)
+    for name in BUILD_COMPONENTS
+}
+_BUILD_FIELDS = tuple(
+    name for name in SavedBuildOut.model_fields if name not in BUILD_COMPONENTS
+)
+_RATING_FIELDS = tuple(BuildRatingOut.model_fields)
+_PUBLISHED_FIELDS = tuple(
+    name for name in PublishedBuildOut.model_fields if name not in ("build", "ratings")
+)
+_SUMMARY_FIELDS = tuple(
+    name for name in PublishedBuildSummary.model_fields if name != "components"
+)
+
+
+def schema_fields(schema: type[BaseModel]) -> tuple[str, ...]:
+    return tuple(schema.model_fields)
+
+
+def row_dict(row, fields: Iterable[str]) -> dict:
+    """Read the schema's fields straight off an ORM row, skipping validation."""
+    return {field: getattr(row, field) for field in fields}
+
+
+def rows_to_dicts(rows: Iterable, schema: type[BaseModel]) -> list[dict]:
+    fields = schema_fields(schema)
+    return [row_dict(row, fields) for row in rows]
+
+
+def dump_rows(rows: Iterable, schema: type[BaseModel]) -> bytes:
+    return orjson.dumps(rows_to_dicts(rows, schema))
+
+
+def saved_build_dict(build) -> dict:
+    """SavedBuildOut-shaped dict for a SavedBuild row."""
+    data = row_dict(build, _BUILD_FIELDS)
+    for name in BUILD_COMPONENTS:
+        component = getattr(build, name)
+        data[name] = row_dict(component, _COMPONENT_FIELDS[name]) if component is not None else None
+    return data
+
+
+def rating_dict(rating) -> dict:
+    return row_dict(rating, _RATING_FIELDS)
+
+
+def published_build_dict(published_build, include_ratings: bool = True) -> dict:
+    """PublishedBuildOut-shaped dict for a PublishedBuild row."""
+    data = row_dict(published_build, _PUBLISHED_FIELDS)
+    data["build"] = saved_build_dict(published_build.build)
+    data["ratings"] = [rating_dict(rating) for rating in published_build.ratings] if include_ratings else []
+    return data
+
+
+def published_build_summary_dict(row) -> dict:
+    """
+    PublishedBuildSummary-shaped dict for a gallery row carrying the summary
+    fields plus one name column per component, labelled as in BUILD_COMPONENTS.
+    """
+    data = row_dict(row, _SUMMARY_FIELDS)
+    data["components"] = {name: getattr(row, name) for name in BUILD_COMPONENTS}
+    return data
+
+
+def orjson_response(content, status_code: int = 200, headers: Optional[dict] = None) -> ORJSONResponse:
+    """
+    Response for data we loaded from our own database. Bypasses response_model
+    validation, which only re-checks rows the ORM already typed.
+    """
+    return ORJSONResponse(content=content, status_code=status_code, headers=headers)
@@ -8,5 +8,15 @@ load_dotenv()
 class Settings(BaseModel):
     DB_URL: str = os.getenv("DB_URL", "")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # HMAC key for signed access tokens; signed tokens are rejected without one
+    SECRET_KEY: str = os.getenv("SECRET_KEY", "")
+    # Issue signed tokens at login instead of database tokens
+    SIGNED_TOKENS: bool = os.getenv("SIGNED_TOKENS", "false").lower() in ("1", "true", "yes")
+    # Threads that run bcrypt, and how many requests may wait for one
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE_LIMIT: int = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "16"))
+    # Where rate limit counters live: sql:// shares them between workers through
+    # the database; memory:// or redis://host:port are also accepted
+    RATE_LIMIT_STORAGE_URI: str = os.getenv("RATE_LIMIT_STORAGE_URI", "sql://")
 
 settings = Settings()
@@ -0,0 +1,73 @@
+from sqlalchemy import select, delete
+from database import AsyncSessionLocal
+from models import Token, RevokedToken
+from core.settings import settings
+from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# How often each worker sweeps, and how many rows one delete may touch. Small
+# batches keep every transaction short, so logins never wait behind a sweep.
+TOKEN_SWEEP_INTERVAL = 300.0
+TOKEN_SWEEP_BATCH_SIZE = 1000
+
+
+async def _delete_batch(db, model, column, cutoff: datetime, batch_size: int) -> int:
+    batch = select(model.id).where(column < cutoff).order_by(model.id).limit(batch_size)
+    if db.get_bind().dialect.name == "postgresql":
+        # Rows another worker's sweep already holds are skipped, not waited on
+        batch = batch.with_for_update(skip_locked=True)
+    result = await db.execute(
+        delete(model).where(model.id.in_(batch.scalar_subquery())).execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def _sweep_table(model, column, cutoff: datetime, batch_size: int) -> int:
+    removed = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            deleted = await _delete_batch(db, model, column, cutoff, batch_size)
+        removed += deleted
+        if deleted < batch_size:
+            return removed
+        # Let request handlers run between batches
+        await asyncio.sleep(0)
+
+
+async def sweep_expired_tokens(batch_size: int = TOKEN_SWEEP_BATCH_SIZE) -> dict:
+    """
+    Delete database tokens older than ACCESS_TOKEN_EXPIRE_MINUTES, and
+    revocation entries for signed tokens that have expired, in batches.
+    """
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    cutoff = now - timedelta(minutes=int(settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+
+    tokens = await _sweep_table(Token, Token.created, cutoff, batch_size)
+    revocations = await _sweep_table(RevokedToken, RevokedToken.expires_at, now, batch_size)
+
+    return {
+        "tokens": tokens,
+        "revoked_tokens": revocations,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+async def run_token_sweeper(interval: float = TOKEN_SWEEP_INTERVAL):
+    """Background loop started from the app lifespan; cancelled on shutdown."""
+    while True:
+        try:
+            result = await sweep_expired_tokens()
+            if result["tokens"] or result["revoked_tokens"]:
+                logger.info(
+                    "Token sweep removed %d tokens and %d revocations in %.3fs",
+                    result["tokens"], result["revoked_tokens"], result["seconds"]
+                )
+        except Exception as e:
+            logger.error(f"Token sweep failed: {str(e)}")
+        await asyncio.sleep(interval)
@@ -0,0 +1,157 @@
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import RevokedToken
+from core.settings import settings
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+
+# Signed tokens look like "v1.<claims>.<signature>". Database tokens are bare
+# urlsafe base64 and never contain a dot, so the two formats cannot collide.
+SIGNED_TOKEN_PREFIX = "v1"
+
+# How often a worker reloads the revocation list from the database. Tokens
+# revoked through this worker are rejected at once, through other workers
+# within this many seconds.
+REVOCATION_SYNC_INTERVAL = 10.0
+
+
+class SignedTokenClaims:
+    __slots__ = ("user_id", "issued_at", "expires_at", "jti")
+
+    def __init__(self, user_id: int, issued_at: datetime, expires_at: datetime, jti: str):
+        self.user_id = user_id
+        self.issued_at = issued_at
+        self.expires_at = expires_at
+        self.jti = jti
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(payload: str) -> str:
+    digest = hmac.new(settings.SECRET_KEY.encode(), payload.encode(), hashlib.sha256).digest()
+    return _b64encode(digest)
+
+
+def is_signed_token(token: str) -> bool:
+    return token.startswith(SIGNED_TOKEN_PREFIX + ".")
+
+
+def create_signed_token(user_id: int) -> tuple[str, SignedTokenClaims]:
+    """Issue a token that carries its own user id and expiry, signed with SECRET_KEY."""
+    if not settings.SECRET_KEY:
+        raise RuntimeError("SECRET_KEY must be set to issue signed tokens")
+
+    issued_at = datetime.now(timezone.utc).replace(microsecond=0)
+    expires_at = issued_at + timedelta(minutes=int(settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+    claims = SignedTokenClaims(user_id, issued_at, expires_at, secrets.token_hex(16))
+
+    payload = _b64encode(json.dumps({
+        "sub": user_id,
+        "iat": int(issued_at.timestamp()),
+        "exp": int(expires_at.timestamp()),
+        "jti": claims.jti,
+    }, separators=(",", ":")).encode())
+    signed = f"{SIGNED_TOKEN_PREFIX}.{payload}"
+    return f"{signed}.{_signature(signed)}", claims
+
+
+def verify_signed_token(token: str) -> Optional[SignedTokenClaims]:
+    """
+    Claims of a correctly signed, unexpired token, or None. Revocation is
+    checked separately against the revocation list.
+    """
+    if not settings.SECRET_KEY:
+        return None
+    try:
+        prefix, payload, signature = token.split(".")
+    except ValueError:
+        return None
+    if prefix != SIGNED_TOKEN_PREFIX:
+        return None
+    if not hmac.compare_digest(signature, _signature(f"{prefix}.{payload}")):
+        return None
+
+    try:
+        data = json.loads(_b64decode(payload))
+        claims = SignedTokenClaims(
+            user_id=int(data["sub"]),
+            issued_at=datetime.fromtimestamp(data["iat"], timezone.utc),
+            expires_at=datetime.fromtimestamp(data["exp"], timezone.utc),
+            jti=str(data["jti"]),
+        )
+    except (ValueError, KeyError, TypeError):
+        return None
+
+    if claims.expires_at <= datetime.now(timezone.utc):
+        return None
+    return claims
+
+
+class RevocationList:
+    """
+    In-memory set of revoked signed-token ids, reloaded from `revoked_tokens`.
+
+    Only tokens that have not expired yet are kept (expired ones fail
+    verification anyway), so the set stays as small as the number of logouts
+    within one token lifetime.
+    """
+
+    def __init__(self, sync_interval: float = REVOCATION_SYNC_INTERVAL):
+        self.sync_interval = sync_interval
+        self._revoked: dict[str, datetime] = {}
+        self._synced_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    async def sync(self, db: AsyncSession, force: bool = False):
+        now = time.monotonic()
+        if not force and self._synced_at is not None and now - self._synced_at < self.sync_interval:
+            return
+
+        # Stored without a time zone, like every other timestamp column
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None)
+        rows = (await db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > cutoff)
+        )).all()
+        with self._lock:
+            # Revocations are never undone, so keep local ones the query may
+            # have raced with and only drop what has expired
+            revoked = {jti: expires_at for jti, expires_at in self._revoked.items() if expires_at > cutoff}
+            revoked.update((row.jti, row.expires_at) for row in rows)
+            self._revoked = revoked
+            self._synced_at = now
+
+    async def revoke(self, db: AsyncSession, claims: SignedTokenClaims):
+        """Record a revocation for every worker and apply it to this one immediately."""
+        expires_at = claims.expires_at.replace(tzinfo=None)
+        # Concurrent logouts with the same token both insert; the loser's row
+        # is already there, so its conflict is not an error
+        insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        await db.execute(
+            insert(RevokedToken)
+            .values(jti=claims.jti, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        )
+        await db.commit()
+        with self._lock:
+            self._revoked[claims.jti] = expires_at
+
+
+revocations = RevocationList()
+
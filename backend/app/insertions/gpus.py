@@ -1,7 +1,7 @@
 import json
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, DECIMAL
+from sqlalchemy import create_engine, Column, Integer, String, DECIMAL, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # Load environment variables
@@ -70,6 +70,8 @@ def insert_from_json(json_file):
         session.add(gpu)
         new_records += 1
 
+    # Bump the catalog version so running API workers drop cached lists
+    session.execute(text("UPDATE catalog_version SET version = version + 1, updated_at = now() WHERE id = 1"))
     session.commit()
     print(f"Inserted {new_records} new records from {json_file} successfully.")
 
@@ -1,6 +1,6 @@
 import json
 import os
-from sqlalchemy import create_engine, Column, Integer, String, DECIMAL
+from sqlalchemy import create_engine, Column, Integer, String, DECIMAL, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -56,6 +56,8 @@ def insert_from_json(json_file):
             session.add(motherboard)
             inserted_count += 1
 
+        # Bump the catalog version so running API workers drop cached lists
+        session.execute(text("UPDATE catalog_version SET version = version + 1, updated_at = now() WHERE id = 1"))
         session.commit()
         print(f"Inserted {inserted_count} new records from {json_file} successfully.")
 
@@ -1,7 +1,7 @@
 import json
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, DECIMAL, CheckConstraint
+from sqlalchemy import create_engine, Column, Integer, String, DECIMAL, CheckConstraint, text
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 # Load environment variables from .env file
@@ -94,6 +94,8 @@ def insert_from_json(json_file):
             else:
                 print(f"Skipping duplicate: {item.get('name')}")
 
+        # Bump the catalog version so running API workers drop cached lists
+        session.execute(text("UPDATE catalog_version SET version = version + 1, updated_at = now() WHERE id = 1"))
         session.commit()
         print(f"Inserted {inserted_count} new records from {json_file} successfully.")
 
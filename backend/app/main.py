@@ -1,17 +1,35 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.endpoints import components, auth, optimize
+from core.token_sweeper import run_token_sweeper
+from core.leaderboard import run_leaderboard_sync
+from core.security import run_pool_stats_logger
+from database import async_engine
+from contextlib import asynccontextmanager, suppress
+import asyncio
 import threading
 import os
 import sys
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
+from core.rate_limit import limiter
 
-# Rate limiting setup
-limiter = Limiter(key_func=get_remote_address)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Expired tokens are deleted by every worker; batches never overlap
+    sweeper = asyncio.create_task(run_token_sweeper())
+    # Each worker builds its own leaderboard and refreshes it periodically
+    leaderboard_sync = asyncio.create_task(run_leaderboard_sync())
+    # Password hashing pool load, for sizing PASSWORD_HASH_WORKERS
+    pool_stats = asyncio.create_task(run_pool_stats_logger())
+    yield
+    for task in (sweeper, leaderboard_sync, pool_stats):
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await async_engine.dispose()
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Add rate limiting middleware
 app.state.limiter = limiter
@@ -34,6 +52,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],  # Be specific about methods
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],  # Catalog pagination and caching
 )
 
 # Import and run ChromaDB population script
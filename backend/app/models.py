@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, Float, Boolean, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
@@ -12,13 +12,24 @@ class Base(DeclarativeBase):
 class Token(Base):
     __tablename__ = "tokens"
 
+    # Naive UTC like the other timestamp columns (asyncpg rejects aware
+    # datetimes for timestamp without time zone); indexed for the sweeper
     created: Mapped[datetime] = mapped_column(
-        default=lambda: datetime.now(timezone.utc)
+        default=lambda: datetime.now(timezone.utc).replace(tzinfo=None),
+        index=True
     )
     token: Mapped[str] = mapped_column(String, unique=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     user: Mapped["User"] = relationship(back_populates="tokens")
 
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    # Signed tokens are never stored, so logging one out records its id here
+    # until it would have expired anyway
+    jti: Mapped[str] = mapped_column(String(32), unique=True)
+    expires_at: Mapped[datetime] = mapped_column(index=True)
+
 class User(Base):
     __tablename__ = "users"
 
@@ -50,6 +61,12 @@ class CPU(Base):
     cache = Column(Integer)
     price = Column(Float, nullable=False)
 
+    # Keyset pagination indexes for the catalog sort orders
+    __table_args__ = (
+        Index("ix_cpus_price_id", "price", "id"),
+        Index("ix_cpus_name_id", "name", "id"),
+    )
+
 class RAM(Base):
     __tablename__ = "ram"
 
@@ -63,6 +80,11 @@ class RAM(Base):
     memory_type = Column(String)
     price = Column(Float)
 
+    __table_args__ = (
+        Index("ix_ram_price_id", "price", "id"),
+        Index("ix_ram_name_id", "name", "id"),
+    )
+
 class PSU(Base):
     __tablename__ = "psus"
 
@@ -75,6 +97,11 @@ class PSU(Base):
     color = Column(String)
     price = Column(Float)
 
+    __table_args__ = (
+        Index("ix_psus_price_id", "price", "id"),
+        Index("ix_psus_name_id", "name", "id"),
+    )
+
 class GPU(Base):
     __tablename__ = "gpus"
 
@@ -88,6 +115,11 @@ class GPU(Base):
     recommended_wattage = Column(Float, nullable=True)
     price = Column(Float)
 
+    __table_args__ = (
+        Index("ix_gpus_price_id", "price", "id"),
+        Index("ix_gpus_name_id", "name", "id"),
+    )
+
 class Case(Base):
     __tablename__ = "chassis"
 
@@ -100,6 +132,11 @@ class Case(Base):
     additional_features = Column(String, nullable=True)
     price = Column(Float)
 
+    __table_args__ = (
+        Index("ix_chassis_price_id", "price", "id"),
+        Index("ix_chassis_name_id", "name", "id"),
+    )
+
 class Motherboard(Base):
     __tablename__ = "motherboards"
 
@@ -112,6 +149,11 @@ class Motherboard(Base):
     memory_type = Column(String)
     price = Column(Float)
 
+    __table_args__ = (
+        Index("ix_motherboards_price_id", "price", "id"),
+        Index("ix_motherboards_name_id", "name", "id"),
+    )
+
 class Storage(Base):
     __tablename__ = "storage_devices"
 
@@ -126,6 +168,11 @@ class Storage(Base):
     write_speed = Column(Float, nullable=True)
     price = Column(Float)
 
+    __table_args__ = (
+        Index("ix_storage_devices_price_id", "price", "id"),
+        Index("ix_storage_devices_name_id", "name", "id"),
+    )
+
 class Cooler(Base):
     __tablename__ = "cpu_coolers"
 
@@ -137,21 +184,32 @@ class Cooler(Base):
     size = Column(Float, nullable=True)
     price = Column(Float)
 
+    __table_args__ = (
+        Index("ix_cpu_coolers_price_id", "price", "id"),
+        Index("ix_cpu_coolers_name_id", "name", "id"),
+    )
+
 class SavedBuild(Base):
     __tablename__ = "saved_builds"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
-    purpose = Column(String, nullable=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    cpu_id = Column(Integer, ForeignKey("cpus.id"))
-    gpu_id = Column(Integer, ForeignKey("gpus.id"))
-    motherboard_id = Column(Integer, ForeignKey("motherboards.id"))
-    ram_id = Column(Integer, ForeignKey("ram.id"))
-    psu_id = Column(Integer, ForeignKey("psus.id"))
-    case_id = Column(Integer, ForeignKey("chassis.id"))
-    storage_id = Column(Integer, ForeignKey("storage_devices.id"))
-    cooler_id = Column(Integer, ForeignKey("cpu_coolers.id"))
+    # Gallery filter columns are indexed; user_id serves "my builds"
+    purpose = Column(String, nullable=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    cpu_id = Column(Integer, ForeignKey("cpus.id"), index=True)
+    gpu_id = Column(Integer, ForeignKey("gpus.id"), index=True)
+    motherboard_id = Column(Integer, ForeignKey("motherboards.id"), index=True)
+    ram_id = Column(Integer, ForeignKey("ram.id"), index=True)
+    psu_id = Column(Integer, ForeignKey("psus.id"), index=True)
+    case_id = Column(Integer, ForeignKey("chassis.id"), index=True)
+    storage_id = Column(Integer, ForeignKey("storage_devices.id"), index=True)
+    cooler_id = Column(Integer, ForeignKey("cpu_coolers.id"), index=True)
+    # Sum of the component prices, kept current by core.build_prices
+    total_price = Column(Float, nullable=True)
+    # Name, purpose and component names for the gallery search, kept current
+    # by core.build_search
+    search_document = Column(Text, nullable=False, default="", server_default="")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_published = Column(Boolean, default=False)
@@ -167,6 +225,11 @@ class SavedBuild(Base):
     storage = relationship("Storage")
     cooler = relationship("Cooler")
 
+    # Keyset index for the "cheapest" gallery sort; also serves price ranges
+    __table_args__ = (
+        Index("ix_saved_builds_total_price_id", "total_price", "id"),
+    )
+
 class OptimizationHistory(Base):
     __tablename__ = "optimization_history"
 
@@ -186,10 +249,11 @@ class PublishedBuild(Base):
     __tablename__ = "published_builds"
 
     id = Column(Integer, primary_key=True, index=True)
-    build_id = Column(Integer, ForeignKey("saved_builds.id"), nullable=False)
+    build_id = Column(Integer, ForeignKey("saved_builds.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    avg_rating = Column(Float, default=0)  # Average rating (0-5)
+    avg_rating = Column(Float, default=0)  # Average rating (0-5), rating_sum / rating_count
     rating_count = Column(Integer, default=0)  # Number of ratings
+    rating_sum = Column(Float, default=0, nullable=False, server_default="0")  # Sum of all ratings
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -197,6 +261,13 @@ class PublishedBuild(Base):
     user = relationship("User")
     ratings = relationship("BuildRating", back_populates="published_build")
 
+    # Keyset indexes for the gallery sort orders (see core.gallery)
+    __table_args__ = (
+        Index("ix_published_builds_created_at_id", "created_at", "id"),
+        Index("ix_published_builds_avg_rating_id", "avg_rating", "id"),
+        Index("ix_published_builds_rating_count_id", "rating_count", "id"),
+    )
+
 class BuildRating(Base):
     __tablename__ = "build_ratings"
 
@@ -214,4 +285,25 @@ class BuildRating(Base):
     # Composite unique constraint to ensure a user can only rate a build once
     __table_args__ = (
         UniqueConstraint('published_build_id', 'user_id', name='unique_user_build_rating'),
-    )
\ No newline at end of file
+        # A build's ratings, newest first
+        Index('ix_build_ratings_published_build_id_created_at', 'published_build_id', 'created_at'),
+    )
+
+
+class CatalogVersion(Base):
+    __tablename__ = "catalog_version"
+
+    # Single row (id=1) bumped by every write to a component table,
+    # including ingestion runs, so API workers know when to reload
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class RateLimitCounter(Base):
+    __tablename__ = "rate_limit_counters"
+
+    # Fixed-window counters shared by all API workers (core.rate_limit)
+    id = Column(Integer, primary_key=True)
+    key = Column(String(255), nullable=False, unique=True)
+    count = Column(Integer, nullable=False, default=0)
+    expires_at = Column(Float, nullable=False, index=True)
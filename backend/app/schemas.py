@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -156,6 +156,25 @@ class SavedBuildCreate(BaseModel):
     cooler_id: Optional[int] = None
     is_published: Optional[bool] = False
 
+# Largest batch the /builds/batch endpoints accept
+MAX_BATCH_BUILDS = 100
+
+class SavedBuildBatchCreate(BaseModel):
+    builds: List[SavedBuildCreate] = Field(..., min_length=1, max_length=MAX_BATCH_BUILDS)
+
+class BuildIdBatch(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_BUILDS)
+
+class BatchItemResult(BaseModel):
+    index: int  # Position in the request
+    id: Optional[int] = None  # Saved build id; for publish, published_id is the gallery id
+    published_id: Optional[int] = None
+    status: int  # HTTP status this item would have had on its own
+    detail: Optional[str] = None
+
+class BatchResult(BaseModel):
+    results: List[BatchItemResult]
+
 class SavedBuildOut(BaseModel):
     id: int
     name: str
@@ -169,6 +188,7 @@ class SavedBuildOut(BaseModel):
     case: Optional[CaseModel] = None
     storage: Optional[StorageModel] = None
     cooler: Optional[CoolerModel] = None
+    total_price: Optional[float] = None
     created_at: datetime
     updated_at: datetime
 
@@ -239,8 +259,29 @@ class PublishedBuildOut(BaseModel):
     
     model_config = ConfigDict(from_attributes=True)
 
+class PublishedBuildSummary(BaseModel):
+    """Gallery card for a published build; ratings are fetched separately"""
+    id: int
+    build_id: int
+    name: str
+    purpose: Optional[str] = None
+    total_price: Optional[float] = None
+    avg_rating: float
+    rating_count: int
+    created_at: datetime
+    components: Dict[str, Optional[str]]  # component name per slot (cpu, gpu, ...)
+
+class LeaderboardEntry(PublishedBuildSummary):
+    score: float  # Bayesian rating for "top", decayed vote activity for "trending"
+
+class LeaderboardResponse(BaseModel):
+    board: str
+    purpose: Optional[str] = None
+    builds: list[LeaderboardEntry]
+
 class PublicBuildResponse(BaseModel):
-    builds: list[PublishedBuildOut]
-    total: int
+    builds: list[PublishedBuildSummary]
+    total: Optional[int] = None  # only counted with include_total=true
+    next_cursor: Optional[str] = None
     
     model_config = ConfigDict(from_attributes=True) 
\ No newline at end of file
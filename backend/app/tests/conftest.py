@@ -0,0 +1,103 @@
+"""
+Tests run against a throwaway SQLite file, through the same sync engine and
+async (aiosqlite) engine the app uses. DB_URL has to be set before the
+database module is imported.
+"""
+import os
+import sys
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="pckonfig-tests-")
+os.environ["DB_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from contextlib import contextmanager
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from database import SessionLocal, async_engine, engine
+from models import Base, User, Token, SavedBuild, PublishedBuild, BuildRating, CPU, GPU, Motherboard, RAM, PSU, Case, Storage, Cooler
+from api.endpoints import components
+
+
+@pytest.fixture
+def db():
+    """A session on a freshly created schema."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(components.router, prefix="/api")
+    with TestClient(app) as client:
+        yield client
+
+
+@contextmanager
+def capture_statements(bind=None):
+    """
+    (statement, parameters) for everything `bind` sends while the block runs;
+    by default the async engine requests go through.
+    """
+    bind = bind or async_engine.sync_engine
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+
+
+def query_plan(statement: str, parameters) -> str:
+    """SQLite's EXPLAIN QUERY PLAN for a captured statement, one step per line."""
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return "\n".join(row[-1] for row in rows)
+
+
+def add_user(db, email: str, token: str) -> User:
+    user = User(email=email, hashed_password="x")
+    db.add(user)
+    db.flush()
+    db.add(Token(token=token, user_id=user.id))
+    return user
+
+
+def add_parts(db) -> dict:
+    """One part of every type, as SavedBuild foreign key values."""
+    parts = {
+        "cpu_id": CPU(name="AMD Ryzen 7 7800X3D", brand="AMD", socket="AM5", cores=8, price=4290),
+        "gpu_id": GPU(name="RTX 4070 Super", brand="NVIDIA", recommended_wattage=650, price=7490),
+        "motherboard_id": Motherboard(name="B650 Tomahawk", brand="MSI", socket="Socket AM5", form_factor="ATX", chipset="B650", memory_type="DDR5 SDRAM", price=2390),
+        "ram_id": RAM(name="Kingston Fury 32GB", brand="Kingston", type="DIMM", capacity=32, speed=6000, memory_type="DDR5", price=1290),
+        "psu_id": PSU(name="Corsair RM750e", brand="Corsair", wattage=750, price=1190),
+        "case_id": Case(name="Fractal North", brand="Fractal", form_factor="ATX", price=1690),
+        "storage_id": Storage(name="Samsung 990 Pro 2TB", type="SSD", capacity=2000, read_speed=7450, price=2090),
+        "cooler_id": Cooler(name="Noctua NH-D15", brand="Noctua", type="Air", price=1190),
+    }
+    db.add_all(parts.values())
+    db.flush()
+    return {column: part.id for column, part in parts.items()}
+
+
+def add_builds(db, user, parts: dict, count: int, raters=()) -> list[SavedBuild]:
+    """`count` published builds of `user`, each rated by every one of `raters`."""
+    builds = [SavedBuild(name=f"Build {i}", purpose="1440p Gaming", user_id=user.id, **parts) for i in range(count)]
+    db.add_all(builds)
+    db.flush()
+    for build in builds:
+        published = PublishedBuild(build_id=build.id, user_id=user.id, avg_rating=0, rating_count=0)
+        db.add(published)
+        db.flush()
+        for rater in raters:
+            db.add(BuildRating(published_build_id=published.id, user_id=rater.id, rating=4))
+    return builds
@@ -0,0 +1,47 @@
+from database import engine
+from models import GPU, SavedBuild
+from conftest import add_user, add_parts, capture_statements
+
+
+def refreshes(statements) -> list[str]:
+    # The derived column UPDATE, not the ORM's own write of an edited build
+    return [sql for sql, _ in statements if sql.startswith("UPDATE saved_builds") and "RETURNING" in sql]
+
+
+def test_new_build_gets_price_and_document_in_one_update(db):
+    user = add_user(db, "owner@example.com", "owner")
+    parts = add_parts(db)
+    with capture_statements(engine) as statements:
+        build = SavedBuild(name="Streaming rig", purpose="Streaming", user_id=user.id, **parts)
+        db.add(build)
+        db.flush()
+
+    assert len(refreshes(statements)) == 1
+    assert build.total_price == 4290 + 7490 + 2390 + 1290 + 1190 + 1690 + 2090 + 1190
+    assert build.search_document.startswith("Streaming rig Streaming AMD Ryzen 7 7800X3D RTX 4070 Super")
+
+
+def test_component_changes_refresh_only_what_they_feed(db):
+    user = add_user(db, "owner@example.com", "owner")
+    parts = add_parts(db)
+    build = SavedBuild(name="Streaming rig", user_id=user.id, **parts)
+    db.add(build)
+    db.commit()
+    gpu = db.get(GPU, parts["gpu_id"])
+    total = build.total_price
+
+    with capture_statements(engine) as statements:
+        gpu.price += 1000
+        db.flush()
+    [update] = refreshes(statements)
+    assert "total_price" in update and "search_document" not in update
+    assert build.total_price == total + 1000
+
+    with capture_statements(engine) as statements:
+        gpu.name = "RTX 4070 Ti Super"
+        build.name = "Streaming and gaming rig"
+        db.flush()
+    [update] = refreshes(statements)
+    assert "search_document" in update and "total_price" not in update
+    assert "RTX 4070 Ti Super" in build.search_document
+    assert build.search_document.startswith("Streaming and gaming rig")
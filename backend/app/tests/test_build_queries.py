@@ -0,0 +1,44 @@
+from conftest import add_user, add_parts, add_builds, capture_statements
+
+PAGE_SIZES = (1, 5, 20)
+
+
+def test_gallery_query_count_does_not_grow_with_page_size(db, client):
+    owner = add_user(db, "owner@example.com", "gallery-owner")
+    raters = [add_user(db, f"rater{i}@example.com", f"gallery-rater-{i}") for i in range(2)]
+    add_builds(db, owner, add_parts(db), max(PAGE_SIZES) + 5, raters)
+    db.commit()
+
+    counts = {}
+    for size in PAGE_SIZES:
+        with capture_statements() as statements:
+            response = client.get("/api/builds/public", params={"limit": size})
+        assert response.status_code == 200
+        assert len(response.json()["builds"]) == size
+        counts[size] = len(statements)
+
+    assert len(set(counts.values())) == 1, counts
+
+
+def test_user_builds_query_count_does_not_grow_with_build_count(db, client):
+    parts = add_parts(db)
+    tokens = {}
+    for size in PAGE_SIZES:
+        user = add_user(db, f"user{size}@example.com", f"builds-{size}")
+        add_builds(db, user, parts, size)
+        tokens[size] = f"builds-{size}"
+    db.commit()
+
+    counts = {}
+    for size, token in tokens.items():
+        headers = {"Authorization": f"Bearer {token}"}
+        # Resolve the token first, so only the build reads are counted
+        assert client.get("/api/builds", headers=headers).status_code == 200
+        with capture_statements() as statements:
+            response = client.get("/api/builds", headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()) == size
+        assert all(build["cpu"] and build["gpu"] for build in response.json())
+        counts[size] = len(statements)
+
+    assert len(set(counts.values())) == 1, counts
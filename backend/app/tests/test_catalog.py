@@ -0,0 +1,81 @@
+import pytest
+from models import CPU, GPU
+from conftest import capture_statements, query_plan
+
+
+@pytest.fixture
+def gpus(db):
+    """Twelve priced GPUs and three without a price."""
+    rows = [GPU(name=f"RTX {4000 + i}", brand="NVIDIA", price=3000 + 100 * i) for i in range(12)]
+    rows += [GPU(name=f"Unpriced {i}", brand="NVIDIA", price=None) for i in range(3)]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def walk(client, path: str, params: dict) -> list[int]:
+    ids, cursor = [], None
+    while True:
+        response = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        ids += [item["id"] for item in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return ids
+
+
+@pytest.mark.parametrize("sort, descending", [("price_asc", False), ("price_desc", True)])
+def test_unpriced_parts_come_last_on_every_page(client, gpus, sort, descending):
+    priced = sorted((gpu for gpu in gpus if gpu.price is not None), key=lambda gpu: gpu.price, reverse=descending)
+    unpriced = sorted((gpu.id for gpu in gpus if gpu.price is None), reverse=descending)
+    expected = [gpu.id for gpu in priced] + unpriced
+
+    assert walk(client, "/api/gpus", {"sort": sort, "limit": 4}) == expected
+    for skip in range(len(expected)):
+        response = client.get("/api/gpus", params={"sort": sort, "limit": 4, "skip": skip})
+        assert [item["id"] for item in response.json()] == expected[skip:skip + 4]
+
+
+def test_price_pages_are_index_range_scans(client, gpus):
+    with capture_statements() as statements:
+        walk(client, "/api/gpus", {"sort": "price_desc", "limit": 4})
+
+    reads = [(sql, parameters) for sql, parameters in statements if "FROM gpus" in sql]
+    assert reads
+    for sql, parameters in reads:
+        plan = query_plan(sql, parameters)
+        assert "USING INDEX ix_gpus_price_id" in plan or "USING COVERING INDEX ix_gpus_price_id" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
+
+
+def test_cpu_list_is_paged_by_default(client, db):
+    db.add_all(CPU(name=f"Ryzen {i}", brand="AMD", socket="AM5", cores=8, price=1000 + i) for i in range(60))
+    db.commit()
+
+    with capture_statements() as statements:
+        response = client.get("/api/cpus")
+    assert response.status_code == 200
+    assert [item["price"] for item in response.json()] == [1000 + i for i in range(59, 9, -1)]
+    assert response.headers.get("x-next-cursor")
+
+    # price is NOT NULL on cpus, so there is no second read for unpriced rows
+    reads = [sql for sql, _ in statements if "FROM cpus" in sql]
+    assert len(reads) == 1
+    assert "IS NULL" not in reads[0]
+
+
+def test_cpu_search_matches_socket(client, db):
+    db.add_all([
+        CPU(name="AMD Ryzen 7 7800X3D", brand="AMD", socket="AM5", cores=8, price=4290),
+        CPU(name="AMD Ryzen 5 5600X", brand="AMD", socket="AM4", cores=6, price=1490),
+        CPU(name="Intel Core i5-14600K", brand="Intel", socket="LGA1700", cores=14, price=3290),
+    ])
+    db.commit()
+
+    response = client.get("/api/cpus", params={"search": "am5"})
+    assert response.status_code == 200
+    # AM4 is a fuzzy match, ranked below the exact socket
+    assert [cpu["socket"] for cpu in response.json()] == ["AM5", "AM4"]
+
+    response = client.get("/api/cpus", params={"search": "ryzen"})
+    assert {cpu["socket"] for cpu in response.json()} == {"AM5", "AM4"}
@@ -0,0 +1,56 @@
+import pytest
+from conftest import add_user, add_parts, add_builds, capture_statements, query_plan
+
+# Gallery filter -> the saved_builds index it should use
+FILTER_INDEXES = {
+    "purpose": "ix_saved_builds_purpose",
+    "cpu_id": "ix_saved_builds_cpu_id",
+    "gpu_id": "ix_saved_builds_gpu_id",
+    "case_id": "ix_saved_builds_case_id",
+    "ram_id": "ix_saved_builds_ram_id",
+    "storage_id": "ix_saved_builds_storage_id",
+    "cooler_id": "ix_saved_builds_cooler_id",
+    "psu_id": "ix_saved_builds_psu_id",
+}
+
+
+@pytest.fixture
+def gallery(db):
+    owner = add_user(db, "owner@example.com", "gallery-owner")
+    rater = add_user(db, "rater@example.com", "gallery-rater")
+    parts = add_parts(db)
+    add_builds(db, owner, parts, 3, [rater])
+    db.commit()
+    return parts
+
+
+def page_plan(client, path: str, params: dict, table: str) -> str:
+    """Query plan of the ordered read from `table` that a GET of `path` sends."""
+    with capture_statements() as statements:
+        response = client.get(path, params=params)
+    assert response.status_code == 200
+
+    reads = [(sql, parameters) for sql, parameters in statements if f"FROM {table}" in sql and "ORDER BY" in sql]
+    assert len(reads) == 1, [sql for sql, _ in statements]
+    return query_plan(*reads[0])
+
+
+def test_unfiltered_gallery_walks_the_created_at_index(client, gallery):
+    plan = page_plan(client, "/api/builds/public", {}, "published_builds")
+    assert "published_builds USING INDEX ix_published_builds_created_at_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.parametrize("column, index", FILTER_INDEXES.items())
+def test_gallery_filter_uses_its_index(client, gallery, column, index):
+    value = "1440p Gaming" if column == "purpose" else gallery[column]
+    plan = page_plan(client, "/api/builds/public", {column: value}, "published_builds")
+    assert f"saved_builds USING INDEX {index}" in plan
+    # The matching builds' publications are found through build_id
+    assert "published_builds USING INDEX ix_published_builds_build_id" in plan
+
+
+def test_ratings_by_build_use_the_published_build_created_at_index(client, gallery):
+    plan = page_plan(client, "/api/builds/public/1/ratings", {}, "build_ratings")
+    assert "build_ratings USING INDEX ix_build_ratings_published_build_id_created_at" in plan
+    assert "TEMP B-TREE" not in plan
@@ -18,6 +18,7 @@ export default function BuildGallery() {
   })
   const [publishedBuilds, setPublishedBuilds] = useState([])
   const [totalBuilds, setTotalBuilds] = useState(0)
+  const [nextCursor, setNextCursor] = useState(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState(null)
   
@@ -42,13 +43,17 @@ export default function BuildGallery() {
     psu_id: null,
     min_price: null,
     max_price: null,
-    skip: 0,
+    q: null,
+    // Empty lets the server choose: best match when searching, else newest
+    sort: '',
     limit: 20
   })
+  const [searchText, setSearchText] = useState('')
 
   // ===== DATA FETCHING =====
   // Fetch builds based on current filter criteria
-  const fetchPublishedBuilds = async (isInitialLoad = false) => {
+  // Pass the cursor from the previous response to append the next page
+  const fetchPublishedBuilds = async (isInitialLoad = false, cursor = null) => {
     try {
       if (isInitialLoad) {
         setLoading(true);
@@ -66,8 +71,15 @@ export default function BuildGallery() {
       if (filters.psu_id) queryParams.append('psu_id', filters.psu_id);
       if (filters.min_price) queryParams.append('min_price', filters.min_price);
       if (filters.max_price) queryParams.append('max_price', filters.max_price);
-      queryParams.append('skip', filters.skip);
+      if (filters.q) queryParams.append('q', filters.q);
+      if (filters.sort) queryParams.append('sort', filters.sort);
       queryParams.append('limit', filters.limit);
+      if (cursor) {
+        queryParams.append('cursor', cursor);
+      } else {
+        // Counting every match is only worth it once per filter change
+        queryParams.append('include_total', 'true');
+      }
       
       console.log("Fetching with filters:", filters);
       console.log("Query params:", queryParams.toString());
@@ -75,8 +87,13 @@ export default function BuildGallery() {
       const response = await fetch(`${API_URL}/api/builds/public?${queryParams}`);
       const data = await response.json();
       
-      setPublishedBuilds(data.builds);
-      setTotalBuilds(data.total);
+      if (cursor) {
+        setPublishedBuilds(prev => [...prev, ...data.builds]);
+      } else {
+        setPublishedBuilds(data.builds);
+        setTotalBuilds(data.total);
+      }
+      setNextCursor(data.next_cursor);
       setLoading(false);
     } catch (err) {
       console.error('Error fetching published builds:', err);
@@ -89,20 +106,13 @@ export default function BuildGallery() {
   useEffect(() => {
     const fetchComponents = async () => {
       try {
-        const responses = await Promise.all([
-          fetch(`${API_URL}/api/cases`),
-          fetch(`${API_URL}/api/cpus`),
-          fetch(`${API_URL}/api/gpus`),
-          fetch(`${API_URL}/api/ram`),
-          fetch(`${API_URL}/api/storage`),
-          fetch(`${API_URL}/api/coolers`),
-          fetch(`${API_URL}/api/psus`),
-          fetch(`${API_URL}/api/motherboards`)
-        ])
-
-        const [cases, cpus, gpus, rams, storages, coolers, psus, motherboards] = await Promise.all(
-          responses.map(res => res.json())
-        )
+        // One request for every component list instead of one per type
+        const response = await fetch(`${API_URL}/api/catalog`)
+        if (!response.ok) {
+          throw new Error(`HTTP error! status: ${response.status}`)
+        }
+        const { components: catalog } = await response.json()
+        const { cases, cpus, gpus, ram: rams, storage: storages, coolers, psus } = catalog
 
         // Create lookup maps for efficient component access by ID
         const cpuMap = Object.fromEntries(cpus.map(cpu => [cpu.id, cpu]));
@@ -146,13 +156,21 @@ export default function BuildGallery() {
     }
   }, [filters, componentMaps.cpuMap]);
 
+  // Search once typing pauses rather than on every keystroke
+  useEffect(() => {
+    const timeout = setTimeout(() => {
+      const q = searchText.trim() || null;
+      setFilters(prev => prev.q === q ? prev : { ...prev, q });
+    }, 300);
+    return () => clearTimeout(timeout);
+  }, [searchText]);
+
   // ===== EVENT HANDLERS =====
   // Update filter state when a filter value changes
   const handleFilterChange = (filterName, value) => {
     setFilters(prev => ({
       ...prev,
-      [filterName]: value,
-      skip: 0 // Reset pagination when changing filters
+      [filterName]: value
     }));
   };
 
@@ -169,9 +187,11 @@ export default function BuildGallery() {
       psu_id: null,
       min_price: null,
       max_price: null,
-      skip: 0,
+      q: null,
+      sort: '',
       limit: 20
     });
+    setSearchText('');
   };
 
   // ===== LOADING STATE UI =====
@@ -247,11 +267,30 @@ export default function BuildGallery() {
             </button>
           </div>
 
+          {/* SORT ORDER */}
+          <div className="flex flex-col gap-1">
+            <label htmlFor="gallery-sort" className="text-sm font-medium">Sort by</label>
+            <select
+              id="gallery-sort"
+              className="border border-gray-300 rounded p-1 text-sm"
+              value={filters.sort}
+              onChange={(e) => handleFilterChange('sort', e.target.value)}
+            >
+              <option value="">{filters.q ? 'Best match' : 'Newest'}</option>
+              {filters.q && <option value="newest">Newest</option>}
+              <option value="top_rated">Top rated</option>
+              <option value="most_rated">Most rated</option>
+              <option value="cheapest">Cheapest</option>
+            </select>
+          </div>
+
           {/* SEARCH: Text search input */}
           <div className="relative">
             <input
               type="search"
               placeholder="Search builds..."
+              value={searchText}
+              onChange={(e) => setSearchText(e.target.value)}
               className="w-full px-3 py-2 border rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500"
             />
           </div>
@@ -405,20 +444,8 @@ export default function BuildGallery() {
           <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-4">
             {publishedBuilds.length > 0 ? (
               publishedBuilds.map((publishedBuild) => {
-                // Get the associated saved build
-                const build = publishedBuild.build;
-                
-                // Calculate total price from all components
-                const totalPrice = [
-                  build.cpu?.price || 0,
-                  build.gpu?.price || 0,
-                  build.ram?.price || 0,
-                  build.storage?.price || 0,
-                  build.motherboard?.price || 0,
-                  build.psu?.price || 0,
-                  build.case?.price || 0,
-                  build.cooler?.price || 0
-                ].reduce((sum, price) => sum + price, 0);
+                // Gallery cards carry component names and the stored total only
+                const parts = publishedBuild.components;
                 
                 return (
                   <div key={publishedBuild.id} className="bg-white rounded-lg shadow-md overflow-hidden">
@@ -428,16 +455,16 @@ export default function BuildGallery() {
                       <div className="relative h-48 bg-gray-100">
                         <img 
                           src="/placeholder-image.jpg" 
-                          alt={`${build.name} Preview`} 
+                          alt={`${publishedBuild.name} Preview`} 
                           className="w-full h-full object-cover"
                         />
                       </div>
                       
                       {/* BUILD INFO */}
                       <div className="p-4">
-                        <h3 className="font-semibold text-lg">{build.name}</h3>
+                        <h3 className="font-semibold text-lg">{publishedBuild.name}</h3>
                         <p className="text-sm text-gray-600 mt-1">
-                          {build.cpu ? build.cpu.name : 'No CPU'} | {build.gpu ? build.gpu.name : 'No GPU'} | {build.ram ? build.ram.name : 'No RAM'} | {build.storage ? build.storage.name : 'No Storage'}
+                          {parts.cpu || 'No CPU'} | {parts.gpu || 'No GPU'} | {parts.ram || 'No RAM'} | {parts.storage || 'No Storage'}
                         </p>
                         
                         {/* RATING */}
@@ -464,7 +491,7 @@ export default function BuildGallery() {
                         
                         {/* PRICE */}
                         <div className="mt-3">
-                          <span className="font-bold text-lg">{totalPrice} kr</span>
+                          <span className="font-bold text-lg">{publishedBuild.total_price || 0} kr</span>
                         </div>
                       </div>
                     </Link>
@@ -478,6 +505,18 @@ export default function BuildGallery() {
             )}
           </div>
         )}
+
+        {/* LOAD MORE: next page from the cursor */}
+        {nextCursor && (
+          <div className="flex justify-center mt-6">
+            <button
+              className="bg-slate-300 text-black hover:bg-slate-400 border-2 border-slate-600 rounded-lg px-4 py-2 shadow-lg"
+              onClick={() => fetchPublishedBuilds(false, nextCursor)}
+            >
+              Load more
+            </button>
+          </div>
+        )}
       </div>
     </div>
   )
@@ -11,8 +11,8 @@ const BuildCarousel = () => {
   useEffect(() => {
     const fetchBuilds = async () => {
       try {
-        // Fetch top 5 builds
-        const buildsResponse = await fetch(`${API_URL}/api/builds/public?limit=5`);
+        // Top 5 builds, served from the in-memory leaderboard
+        const buildsResponse = await fetch(`${API_URL}/api/builds/leaderboard?board=top&limit=5`);
         const buildsData = await buildsResponse.json();
         console.log("Carousel builds:", buildsData);
         setBuilds(buildsData.builds);
@@ -62,9 +62,9 @@ const BuildCarousel = () => {
   }
   
   const currentBuild = builds[currentIndex];
-  const build = currentBuild?.build;
+  const parts = currentBuild?.components;
   
-  if (!build) return null;
+  if (!parts) return null;
   
   return (
     <div className="w-full max-w-4xl mx-auto relative mb-16 overflow-hidden rounded-lg shadow-xl">
@@ -74,17 +74,17 @@ const BuildCarousel = () => {
           <div className="absolute inset-0 flex flex-col justify-end p-8 text-white bg-gradient-to-t from-black/70 to-transparent">
             <img 
               src={placeholderImage} 
-              alt={build.name} 
+              alt={currentBuild.name} 
               className="w-full h-full object-cover"
             />
             <div className="flex justify-between items-end">
               <div>
-                <h2 className="text-3xl font-bold mb-2">{build.name}</h2>
+                <h2 className="text-3xl font-bold mb-2">{currentBuild.name}</h2>
                 <p className="text-lg mb-1">
-                  {build.cpu ? build.cpu.name : 'No CPU'} | {build.gpu ? build.gpu.name : 'No GPU'}
+                  {parts.cpu || 'No CPU'} | {parts.gpu || 'No GPU'}
                 </p>
                 <p className="text-sm text-slate-300 mb-4">
-                  {build.ram ? build.ram.name : 'No RAM'} | {build.storage ? build.storage.name : 'No Storage'}
+                  {parts.ram || 'No RAM'} | {parts.storage || 'No Storage'}
                 </p>
                 
                 {/* Show rating if available */}